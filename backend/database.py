@@ -3,6 +3,7 @@ import motor.motor_asyncio
 import os
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo.errors import OperationFailure
 from utils.logger import logger  # ✅ Added logger
 
 # --- Load Environment Variables ---
@@ -11,6 +12,7 @@ load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60)))
 
 if not MONGO_URI or not DB_NAME:
     logger.error("❌ Missing MONGO_URI or DB_NAME in environment variables")
@@ -38,6 +40,7 @@ try:
     job_user_collection = db["job_user_links"]
     locations_collection = db["locations"]
     saved_jobs_collection = db["saved_jobs"]
+    ai_cache_collection = db["ai_cache"]
 
     logger.info("✅ MongoDB collections initialized successfully")
 except Exception as e:
@@ -51,3 +54,26 @@ try:
 except Exception as e:
     logger.error(f"❌ Failed to initialize GridFS bucket: {e}", exc_info=True)
     raise e
+
+
+# --- Index Management ---
+async def ensure_indexes() -> None:
+    logger.info("Ensuring MongoDB indexes")
+    try:
+        await ai_cache_collection.create_index("created_at", expireAfterSeconds=AI_CACHE_TTL_SECONDS)
+        # Job monitor sweeps: status filter plus the stale-threshold range.
+        await jobs_collection.create_index([("status", 1), ("last_seen_active", 1)])
+        # Recommendation candidate match + recency sort. categories and levels
+        # are both arrays, and a compound index may hold only one array field.
+        await jobs_collection.create_index([("status", 1), ("categories", 1), ("last_seen_active", -1)])
+        # One link per user/job; also serves the per-user state lookups.
+        try:
+            await job_user_collection.create_index([("user_id", 1), ("job_id", 1)], unique=True)
+        except OperationFailure as e:
+            # Existing duplicate links must not block startup; dedupe them and
+            # the index is created on the next start.
+            logger.error(f"❌ Could not create unique user/job index on job_user_collection: {e}")
+        logger.info("✅ MongoDB indexes ensured")
+    except Exception as e:
+        logger.error(f"❌ Failed to ensure MongoDB indexes: {e}", exc_info=True)
+        raise
@@ -4,7 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from utils.logger import logger  # ✅ Logger import
 
+from database import ensure_indexes
 from services.job_monitor import start_job_monitor, stop_job_monitor
+from services.parser_service import shutdown_pdf_pool, start_pdf_pool
+from services.scrapers import html_extractor, job_scraper
 from routes import (
     answers,
     applications,
@@ -80,11 +83,20 @@ logger.info("All routers registered successfully")
 @app.on_event("startup")
 async def _on_startup() -> None:
     logger.info("🚀 Starting AI-Job-Assistant backend services...")
+    try:
+        await ensure_indexes()
+        logger.info("MongoDB indexes ensured successfully")
+    except Exception as e:
+        logger.error(f"Error ensuring indexes: {e}", exc_info=True)
     try:
         start_job_monitor()
         logger.info("Job monitor started successfully")
     except Exception as e:
         logger.error(f"Error during startup: {e}", exc_info=True)
+    try:
+        start_pdf_pool()
+    except Exception as e:
+        logger.error(f"Error starting PDF extraction pool: {e}", exc_info=True)
 
 
 @app.on_event("shutdown")
@@ -95,6 +107,15 @@ async def _on_shutdown() -> None:
         logger.info("Job monitor stopped successfully")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}", exc_info=True)
+    try:
+        await html_extractor.close_async_client()
+        await job_scraper.close_async_client()
+    except Exception as e:
+        logger.error(f"Error closing HTTP clients: {e}", exc_info=True)
+    try:
+        shutdown_pdf_pool()
+    except Exception as e:
+        logger.error(f"Error shutting down PDF extraction pool: {e}", exc_info=True)
 
 
 # --- Basic Routes ---
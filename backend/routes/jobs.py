@@ -61,7 +61,8 @@ async def get_realtime_jobs(
         logger.info(
             f"✅ Found {len(jobs)} jobs for query='{what}' in location='{where}' (page {page})"
         )
-        return {"items": jobs, "count": len(jobs), "page": page, "page_size": page_size}
+        items = [job.to_dict() for job in jobs]
+        return {"items": items, "count": len(items), "page": page, "page_size": page_size}
 
     except ValueError as exc:
         logger.warning(f"Invalid job query parameters: {exc}")
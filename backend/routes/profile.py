@@ -7,6 +7,7 @@ from auth_utils import get_current_user
 from utils.logger import logger  # ✅ Added logger
 import os
 import shutil
+from datetime import datetime
 from urllib.parse import quote, unquote
 
 router = APIRouter()
@@ -23,7 +24,8 @@ async def get_profile(current_user: dict = Depends(get_current_user)):
     logger.info(f"Fetching profile for user {user_id}")
 
     try:
-        profile = await profiles_collection.find_one({"user_id": user_id})
+        # The packed resume embedding is internal and not JSON-serializable.
+        profile = await profiles_collection.find_one({"user_id": user_id}, {"resume_embedding": 0})
         if not profile:
             logger.warning(f"No profile found for user {user_id}")
             return {"message": "No profile found"}
@@ -55,12 +57,14 @@ async def save_profile(profile: UserProfile, current_user: dict = Depends(get_cu
 
     try:
         profile_dict = profile.dict()
+        # Lets the recommender tell when the cached resume embedding is stale.
+        profile_dict["updated_at"] = datetime.utcnow()
         profile_dict["user_id"] = user_id
 
         existing = await profiles_collection.find_one({"user_id": user_id})
         if existing:
             await profiles_collection.update_one(
-                {"user_id": user_id}, {"$set": profile.dict()}
+                {"user_id": user_id}, {"$set": profile_dict}
             )
             logger.info(f"Profile updated for user {user_id}")
             return {"message": "Profile updated"}
@@ -23,7 +23,7 @@ from auth_utils import get_current_user
 from database import fs, resumes_collection
 from models.resume import Resume, ResumeAnalysis
 from services.ai_service import analyze_resume_with_ai
-from services.parser_service import extract_text_from_file
+from services.parser_service import aextract_text_from_file
 from typing import Optional
 from utils.logger import logger  # ✅ Added logger
 
@@ -134,7 +134,7 @@ async def analyze_resume_file(
 
             try:
                 logger.info(f"Extracting text from file: {filename}")
-                resume_text = extract_text_from_file(tmp_path) or ""
+                resume_text = await aextract_text_from_file(tmp_path) or ""
                 logger.info(f"✅ Text extracted successfully (length: {len(resume_text)} chars)")
             except ValueError as exc:
                 logger.error(f"❌ Text extraction failed with ValueError: {exc}", exc_info=True)
@@ -493,7 +493,7 @@ async def get_resume_score_for_current_user(
                 tmp_path = tmpf.name
             logger.info(f"Created temporary file for text extraction: {tmp_path}")
             try:
-                resume_text = extract_text_from_file(tmp_path) or ""
+                resume_text = await aextract_text_from_file(tmp_path) or ""
                 logger.info(f"✅ Text extracted from file (length: {len(resume_text)} chars)")
             finally:
                 try:
@@ -3,7 +3,7 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from fastapi.responses import StreamingResponse
 import tempfile
 import io
-from services.parser_service import extract_text_from_file, parse_resume_text
+from services.parser_service import aextract_text_from_file, aparse_resume_text
 from database import fs, resumes_collection
 from auth_utils import get_current_user
 from bson import ObjectId
@@ -38,11 +38,11 @@ async def upload_resume(
         logger.debug(f"Temporary file created at {tmp_path}")
 
         # ✅ Extract raw text
-        raw_text = extract_text_from_file(tmp_path)
+        raw_text = await aextract_text_from_file(tmp_path)
         logger.info(f"Extracted {len(raw_text)} characters from resume {file.filename}")
 
         # ✅ AI parsing (with fallback handled inside parser_service)
-        structured = parse_resume_text(raw_text)
+        structured = await aparse_resume_text(raw_text)
         logger.info(f"AI parsing completed for resume {file.filename}")
 
         # ✅ Store file in GridFS
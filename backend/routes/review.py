@@ -23,7 +23,7 @@ from auth_utils import get_current_user, get_optional_user
 from database import fs, resume_reviews_collection
 from models.review import ResumeReview, ResumeReviewResult
 from services.ai_service import review_resume_with_ai
-from services.parser_service import extract_text_from_file
+from services.parser_service import aextract_text_from_file
 from utils.logger import logger  # ✅ Added logger
 
 router = APIRouter()
@@ -132,7 +132,7 @@ async def review_resume_file(
         logger.debug(f"Temporary file created: {tmp_path}")
 
         try:
-            resume_text = extract_text_from_file(tmp_path) or ""
+            resume_text = await aextract_text_from_file(tmp_path) or ""
         except ValueError as exc:
             logger.error(f"Text extraction error: {exc}")
             raise HTTPException(status_code=400, detail=str(exc))
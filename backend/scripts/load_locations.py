@@ -2,7 +2,7 @@
 import csv
 import asyncio
 from database import locations_collection
-from services.ai_service import embed_for_matching
+from services.ai_service import embed_for_matching, pack_embedding
 from utils.logger import logger  # ✅ Added logger
 
 async def load_locations():
@@ -43,7 +43,7 @@ async def load_locations():
             
             try:
                 vectors = embed_for_matching(batch)
-                docs = [{"name": name, "embedding": vec} for name, vec in zip(batch, vectors)]
+                docs = [{"name": name, "embedding": pack_embedding(vec)} for name, vec in zip(batch, vectors)]
                 await locations_collection.insert_many(docs)
                 print(f"Inserted {len(docs)} locations")
                 logger.info(f"✅ Successfully inserted {len(docs)} locations (batch {i//batch_size + 1})")
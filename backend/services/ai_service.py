@@ -1,14 +1,27 @@
 import asyncio
+import base64
+import copy
+import functools
+import hashlib
 import json
 import math
 import os
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import httpx
+import numpy as np
+from bson import Binary
 from dotenv import load_dotenv
 from openai import OpenAI
+try:
+    import simsimd
+except ImportError:  # pragma: no cover
+    simsimd = None
 
 from models.review import ResumeReviewResult
+from services import parse_cache
+from utils.cache import LRUCache
 from utils.logger import logger
 
 load_dotenv()
@@ -24,11 +37,23 @@ if not API_KEY or not ENDPOINT:
 if not EMBEDDING_MODEL:
     raise ValueError("Missing AZURE_OPENAI_EMBEDDING_DEPLOYMENT in environment variables.")
 
+# The sync client is shared by every to_thread() call, so size its pool for
+# concurrent requests and let HTTP/2 multiplex them over one connection.
+http_client = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    timeout=60.0,
+)
+
 client = OpenAI(
     api_key=API_KEY,
-    base_url=f"{ENDPOINT}/openai/v1"
+    base_url=f"{ENDPOINT}/openai/v1",
+    http_client=http_client,
 )
 
+PARSE_CACHE_SIZE = int(os.getenv("AI_PARSE_CACHE_SIZE", "512"))
+_parse_cache = LRUCache(maxsize=PARSE_CACHE_SIZE)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -82,33 +107,102 @@ def _clean_similarity(value: Optional[float]) -> Optional[float]:
     return round(float(value), 3)
 
 
-def _cosine_similarity(a: List[float], b: List[float]) -> float:
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
-    if norm_a == 0 or norm_b == 0:
+def _cosine_similarity(a: Any, b: Any) -> float:
+    vec_a = np.ascontiguousarray(a, dtype=np.float32)
+    vec_b = np.ascontiguousarray(b, dtype=np.float32)
+    # A single sqrt over the product of squared norms replaces two norm calls.
+    denom = math.sqrt(float(np.vdot(vec_a, vec_a)) * float(np.vdot(vec_b, vec_b)))
+    if denom == 0:
         return 0.0
-    return dot / (norm_a * norm_b)
+    return float(np.dot(vec_a, vec_b)) / denom
+
+
+def _content_hash(text: str) -> str:
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(f"{CHAT_MODEL}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def _content_hash_cache(func: Callable[[str], Dict[str, Any]]) -> Callable[[str], Dict[str, Any]]:
+    """Memoize a temperature=0 parser on the model name plus a hash of its input.
+
+    Calling the wrapper checks the in-process LRU only. ``wrapper.persisted``
+    is the async path: it checks the LRU, then the Mongo ai_cache collection
+    under the same hash, and only then runs the parser in a worker thread.
+    Persisted values are the full parse output, so resume entries hold the
+    candidate's PII (name, contact details, work and education history); they
+    expire after AI_CACHE_TTL_SECONDS (30 days by default).
+    """
+    kind = func.__name__
+
+    def _lookup(digest: str) -> Optional[Dict[str, Any]]:
+        cached = _parse_cache.get((kind, digest))
+        if cached is None:
+            return None
+        logger.info(f"Using cached {kind} result")
+        return copy.deepcopy(cached)
+
+    @functools.wraps(func)
+    def wrapper(text: str) -> Dict[str, Any]:
+        digest = _content_hash(text)
+        cached = _lookup(digest)
+        if cached is not None:
+            return cached
+
+        result = func(text)
+        _parse_cache.set((kind, digest), copy.deepcopy(result))
+        return result
+
+    async def persisted(text: str, digest: Optional[str] = None) -> Dict[str, Any]:
+        digest = digest or _content_hash(text)
+        cached = _lookup(digest)
+        if cached is not None:
+            return cached
+
+        result = await parse_cache.get_cached(kind, digest)
+        if result is None:
+            result = await asyncio.to_thread(func, text)
+            await parse_cache.set_cached(kind, digest, result)
+        _parse_cache.set((kind, digest), copy.deepcopy(result))
+        return result
+
+    wrapper.persisted = persisted
+    return wrapper
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _decode_embedding(value: Any) -> np.ndarray:
+    if isinstance(value, str):
+        return np.frombuffer(base64.b64decode(value), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
 
 
-def _batched_embeddings(texts: List[str]) -> List[List[float]]:
+def _batched_embeddings(texts: List[str]) -> np.ndarray:
     logger.info(f"Generating embeddings for {len(texts)} text(s)")
     
     try:
         if not texts:
             logger.info("No texts provided for embedding")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         
         if not EMBEDDING_MODEL:
             logger.warning("AZURE_OPENAI_EMBEDDING_DEPLOYMENT not configured")
             raise ValueError("AZURE_OPENAI_EMBEDDING_DEPLOYMENT must be configured for resume scoring.")
         
+        # base64 payloads decode straight into float32 buffers, skipping the
+        # per-float Python list the SDK would otherwise build.
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
-            input=texts
+            input=texts,
+            encoding_format="base64",
         )
+        result = np.vstack([_decode_embedding(item.embedding) for item in response.data])
         logger.info(f"✅ Embeddings generated successfully for {len(texts)} text(s)")
-        return [item.embedding for item in response.data]
+        return result
     
     except Exception as e:
         logger.error(f"❌ Failed to generate embeddings: {e}", exc_info=True)
@@ -161,6 +255,112 @@ def generate_answers_with_ai(profile_text: str, job_description: str) -> str:
         raise
 
 
+RESUME_PARSE_SCHEMA = """{
+  "name": "string",
+  "email": "string",
+  "phone": "string",
+  "linkedin": "string",
+  "github": "string",
+  "twitter": "string",
+  "portfolio": "string",
+  "location": "string",
+  "websites": ["string"],
+  "skills": ["string"],
+  "education": [
+    {
+      "degree": "string",
+      "school": "string",
+      "year": "string",
+      "gpa": "string"
+    }
+  ],
+  "work_experience": [
+    {
+      "company": "string",
+      "role": "string",
+      "duration": "string",
+      "location": "string",
+      "tasks": "string"
+    }
+  ]
+}"""
+
+
+def _normalize_parsed_resume(data: Dict[str, Any]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "name": str(data.get("name", "") or ""),
+        "email": str(data.get("email", "") or ""),
+        "phone": str(data.get("phone", "") or ""),
+        "linkedin": str(data.get("linkedin", "") or ""),
+        "github": str(data.get("github", "") or ""),
+        "twitter": str(data.get("twitter", "") or ""),
+        "portfolio": str(data.get("portfolio", "") or ""),
+        "location": str(data.get("location", "") or ""),
+        "websites": data.get("websites", []) if isinstance(data.get("websites"), list) else [],
+        "skills": [],
+        "education": [],
+        "work_experience": [],
+    }
+
+    # Skills cleanup
+    skills_raw = data.get("skills", [])
+    if isinstance(skills_raw, str):
+        parts = re.split(r"[,\n;|]+", skills_raw)
+        skills_raw = [p.strip() for p in parts if p.strip()]
+    if isinstance(skills_raw, list):
+        # Insertion-ordered dict keyed on the lowercased label keeps the
+        # first spelling of each skill with a single lower() per item.
+        unique_skills: Dict[str, str] = {}
+        for s in skills_raw:
+            label = str(s).strip()
+            if label:
+                unique_skills.setdefault(label.lower(), label)
+        result["skills"] = list(unique_skills.values())
+
+    # Education cleanup
+    education_raw = data.get("education") or []
+    if isinstance(education_raw, dict):
+        education_raw = [education_raw]
+    if isinstance(education_raw, list):
+        for item in education_raw:
+            entry = {
+                "degree": str((item or {}).get("degree", "") or ""),
+                "school": str((item or {}).get("school", "") or ""),
+                "year": str((item or {}).get("year", "") or ""),
+                "gpa": str((item or {}).get("gpa", "") or ""),
+            }
+            result["education"].append(entry)
+
+    # Work experience cleanup
+    experience_raw = data.get("work_experience") or []
+    if isinstance(experience_raw, dict):
+        experience_raw = [experience_raw]
+    if isinstance(experience_raw, list):
+        for item in experience_raw:
+            tasks_value = (item or {}).get("tasks", "")
+            if isinstance(tasks_value, list):
+                sentence = ". ".join(
+                    [str(t).strip().rstrip(".") for t in tasks_value if str(t).strip()]
+                ).strip()
+                if sentence:
+                    tasks_value = sentence + "."
+                else:
+                    tasks_value = ""
+            else:
+                tasks_value = re.sub(r"\s+", " ", str(tasks_value)).strip()
+            entry = {
+                "company": str((item or {}).get("company", "") or ""),
+                "role": str((item or {}).get("role", "") or ""),
+                "duration": str((item or {}).get("duration", "") or ""),
+                "location": str((item or {}).get("location", "") or ""),
+                "tasks": tasks_value,
+            }
+            result["work_experience"].append(entry)
+
+    return result
+
+
+@_content_hash_cache
 def parse_resume_with_ai(resume_text: str) -> Dict[str, Any]:
     """Parse a resume into a predictable structured JSON format."""
     logger.info("Parsing resume with AI")
@@ -168,35 +368,7 @@ def parse_resume_with_ai(resume_text: str) -> Dict[str, Any]:
     try:
         prompt = f"""
     Extract structured data from the resume text and return strict JSON matching this schema:
-    {{
-      "name": "string",
-      "email": "string",
-      "phone": "string",
-      "linkedin": "string",
-      "github": "string",
-      "twitter": "string",
-      "portfolio": "string",
-      "location": "string",
-      "websites": ["string"],
-      "skills": ["string"],
-      "education": [
-        {{
-          "degree": "string",
-          "school": "string",
-          "year": "string",
-          "gpa": "string"
-        }}
-      ],
-      "work_experience": [
-        {{
-          "company": "string",
-          "role": "string",
-          "duration": "string",
-          "location": "string",
-          "tasks": "string"
-        }}
-      ]
-    }}
+    {RESUME_PARSE_SCHEMA}
 
     Rules:
     - Use empty strings ("") or empty lists when information is missing.
@@ -218,75 +390,7 @@ def parse_resume_with_ai(resume_text: str) -> Dict[str, Any]:
         )
 
         raw = (response.choices[0].message.content or "").strip()
-        data = _load_json(raw)
-
-        result: Dict[str, Any] = {
-            "name": str(data.get("name", "") or ""),
-            "email": str(data.get("email", "") or ""),
-            "phone": str(data.get("phone", "") or ""),
-            "linkedin": str(data.get("linkedin", "") or ""),
-            "github": str(data.get("github", "") or ""),
-            "twitter": str(data.get("twitter", "") or ""),
-            "portfolio": str(data.get("portfolio", "") or ""),
-            "location": str(data.get("location", "") or ""),
-            "websites": data.get("websites", []) if isinstance(data.get("websites"), list) else [],
-            "skills": [],
-            "education": [],
-            "work_experience": [],
-        }
-
-        # Skills cleanup
-        skills_raw = data.get("skills", [])
-        if isinstance(skills_raw, str):
-            parts = re.split(r"[,\n;|]+", skills_raw)
-            skills_raw = [p.strip() for p in parts if p.strip()]
-        if isinstance(skills_raw, list):
-            seen = set()
-            for s in skills_raw:
-                label = str(s).strip()
-                if label and label.lower() not in seen:
-                    seen.add(label.lower())
-                    result["skills"].append(label)
-
-        # Education cleanup
-        education_raw = data.get("education") or []
-        if isinstance(education_raw, dict):
-            education_raw = [education_raw]
-        if isinstance(education_raw, list):
-            for item in education_raw:
-                entry = {
-                    "degree": str((item or {}).get("degree", "") or ""),
-                    "school": str((item or {}).get("school", "") or ""),
-                    "year": str((item or {}).get("year", "") or ""),
-                    "gpa": str((item or {}).get("gpa", "") or ""),
-                }
-                result["education"].append(entry)
-
-        # Work experience cleanup
-        experience_raw = data.get("work_experience") or []
-        if isinstance(experience_raw, dict):
-            experience_raw = [experience_raw]
-        if isinstance(experience_raw, list):
-            for item in experience_raw:
-                tasks_value = (item or {}).get("tasks", "")
-                if isinstance(tasks_value, list):
-                    sentence = ". ".join(
-                        [str(t).strip().rstrip(".") for t in tasks_value if str(t).strip()]
-                    ).strip()
-                    if sentence:
-                        tasks_value = sentence + "."
-                    else:
-                        tasks_value = ""
-                else:
-                    tasks_value = re.sub(r"\s+", " ", str(tasks_value)).strip()
-                entry = {
-                    "company": str((item or {}).get("company", "") or ""),
-                    "role": str((item or {}).get("role", "") or ""),
-                    "duration": str((item or {}).get("duration", "") or ""),
-                    "location": str((item or {}).get("location", "") or ""),
-                    "tasks": tasks_value,
-                }
-                result["work_experience"].append(entry)
+        result = _normalize_parsed_resume(_load_json(raw))
 
         logger.info(f"✅ Resume parsed successfully with {len(result['skills'])} skills, {len(result['education'])} education entries, {len(result['work_experience'])} work experiences")
         return result
@@ -296,6 +400,7 @@ def parse_resume_with_ai(resume_text: str) -> Dict[str, Any]:
         raise
 
 
+@_content_hash_cache
 def parse_job_description_with_ai(job_description: str) -> Dict[str, Any]:
     """Extract key requirements from a job description."""
     logger.info("Parsing job description with AI")
@@ -370,6 +475,13 @@ def parse_job_description_with_ai(job_description: str) -> Dict[str, Any]:
 
 DimensionResult = Dict[str, Any]
 
+def _best_matches(requirement_matrix: np.ndarray, evidence_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # One matmul yields every requirement/evidence cosine; argmax keeps the
+    # first best match per requirement, as the old pairwise loop did.
+    sims = cosine_similarity_matrix(requirement_matrix, evidence_matrix)
+    best_indices = sims.argmax(axis=1)
+    return best_indices, sims[np.arange(sims.shape[0]), best_indices]
+
 
 def _score_requirements(
     requirements: List[Dict[str, Any]],
@@ -381,18 +493,16 @@ def _score_requirements(
     logger.info(f"Scoring requirements with label_field={label_field}, threshold={threshold}")
     
     try:
-        cleaned_requirements = []
+        labels: List[str] = []
+        critical_flags: List[bool] = []
         for item in requirements:
             label = str(item.get(label_field, "") or "").strip()
             if not label:
                 continue
-            cleaned_requirements.append({
-                "label": label,
-                "critical": bool(item.get("critical", False)),
-                "notes": str(item.get("notes", "") or ""),
-            })
+            labels.append(label)
+            critical_flags.append(bool(item.get("critical", False)))
 
-        if not cleaned_requirements:
+        if not labels:
             logger.info("No requirements to score, returning 100% score")
             return {
                 "score": 100,
@@ -402,18 +512,22 @@ def _score_requirements(
                 "weight": 0.0,
             }
 
+        req_count = len(labels)
+        criticals = np.array(critical_flags, dtype=bool)
+        weights = np.where(criticals, 2, 1)
+        total_weight = int(weights.sum())
+
         evidence = [text.strip() for text in evidence_texts if str(text).strip()]
         if not evidence:
             logger.warning("No evidence provided for scoring")
             missing_payload = [
                 {
-                    "requirement": item["label"],
-                    "critical": item["critical"],
+                    "requirement": labels[idx],
+                    "critical": critical_flags[idx],
                     "similarity": None,
                 }
-                for item in cleaned_requirements
+                for idx in range(req_count)
             ]
-            total_weight = sum(2 if item["critical"] else 1 for item in cleaned_requirements)
             return {
                 "score": 0,
                 "applicable": True,
@@ -422,46 +536,32 @@ def _score_requirements(
                 "weight": float(total_weight),
             }
 
-        combined_texts = [item["label"] for item in cleaned_requirements] + evidence
-        embeddings = _batched_embeddings(combined_texts)
-        req_count = len(cleaned_requirements)
-        requirement_embeddings = embeddings[:req_count]
-        evidence_embeddings = embeddings[req_count:]
-
-        matched: List[Dict[str, Any]] = []
-        missing: List[Dict[str, Any]] = []
-
-        for idx, item in enumerate(cleaned_requirements):
-            req_vector = requirement_embeddings[idx]
-            best_match: Optional[Dict[str, Any]] = None
-            best_similarity = -1.0
-
-            for evidence_idx, ev_vector in enumerate(evidence_embeddings):
-                similarity = _cosine_similarity(req_vector, ev_vector)
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = {
-                        "requirement": item["label"],
-                        "critical": item["critical"],
-                        "matched_text": evidence[evidence_idx],
-                        "similarity": _clean_similarity(similarity),
-                    }
-
-            if best_match and best_similarity >= threshold:
-                matched.append(best_match)
-            else:
-                missing.append(
-                    {
-                        "requirement": item["label"],
-                        "critical": item["critical"],
-                        "similarity": _clean_similarity(best_similarity if best_similarity > -1 else None),
-                    }
-                )
-
-        total_weight = sum(2 if item.get("critical") else 1 for item in cleaned_requirements)
-        matched_weight = sum(2 if item.get("critical") else 1 for item in matched)
+        embeddings = _batched_embeddings(labels + evidence)
+        best_indices, best_similarities = _best_matches(embeddings[:req_count], embeddings[req_count:])
+        matched_mask = best_similarities >= threshold
+        matched_weight = int(weights[matched_mask].sum())
         score = int(round(100 * matched_weight / total_weight)) if total_weight else 0
 
+        # Requirement data stays in parallel arrays; per-entry dicts are only
+        # materialized for the response payloads.
+        matched: List[Dict[str, Any]] = [
+            {
+                "requirement": labels[idx],
+                "critical": critical_flags[idx],
+                "matched_text": evidence[best_indices[idx]],
+                "similarity": _clean_similarity(best_similarities[idx]),
+            }
+            for idx in np.flatnonzero(matched_mask)
+        ]
+        missing: List[Dict[str, Any]] = [
+            {
+                "requirement": labels[idx],
+                "critical": critical_flags[idx],
+                "similarity": _clean_similarity(best_similarities[idx]),
+            }
+            for idx in np.flatnonzero(~matched_mask)
+        ]
+
         logger.info(f"✅ Requirements scored successfully: {score}% ({len(matched)} matched, {len(missing)} missing)")
         
         return {
@@ -554,12 +654,6 @@ def score_resume_against_job(
 
         overall_score = int(round(weighted_score / active_weight)) if active_weight else 0
 
-        for value in breakdown.values():
-            for entry in value.get("matched", []):
-                entry["similarity"] = _clean_similarity(entry.get("similarity"))
-            for entry in value.get("missing", []):
-                entry["similarity"] = _clean_similarity(entry.get("similarity"))
-
         logger.info(f"✅ Resume scored successfully with overall score: {overall_score}%")
         
         return {
@@ -594,9 +688,11 @@ def _generate_suggestions(
 
         def _summarize(items: List[str], max_items: int = 5) -> str:
             seen: List[str] = []
+            seen_set = set()
             for entry in items:
                 cleaned = entry.strip()
-                if cleaned and cleaned not in seen:
+                if cleaned and cleaned not in seen_set:
+                    seen_set.add(cleaned)
                     seen.append(cleaned)
                 if len(seen) >= max_items:
                     break
@@ -673,10 +769,14 @@ RESUME_REVIEW_SCHEMA = """{
   ]
 }"""
 
-RESUME_REVIEW_PROMPT = """You are an applicant tracking system specialist and senior recruiter. Review the resume text and deliver strict JSON matching this schema (no extra keys, no prose):
-{schema}
+RESUME_REVIEW_PROMPT = """You are an applicant tracking system specialist and senior recruiter. Parse and review the resume text in a single pass and deliver strict JSON with exactly these two top-level keys (no extra keys, no prose):
+{{
+  "parsed": {parse_schema},
+  "review": {schema}
+}}
 Rules:
 - Never add commentary outside the JSON.
+- In "parsed", use empty strings ("") or empty lists when information is missing, keep skills as a deduplicated list of short phrases, and write tasks as a single sentence.
 - Prefer evidence-driven critiques; cite snippets in "evidence".
 - Provide at least two phrasing suggestions when content allows.
 - Limit quick_fixes to the top three highest-impact opportunities.
@@ -686,9 +786,6 @@ Resume text:
 <<<
 {resume_text}
 >>>
-
-Structured summary (for context only):
-{resume_summary}
 """.strip()
 
 def _truncate_resume_text(text: str, limit: int = 12000) -> str:
@@ -698,47 +795,25 @@ def _truncate_resume_text(text: str, limit: int = 12000) -> str:
     return snippet[:limit] + "\n...[truncated]..."
 
 
-def _resume_summary_for_prompt(resume_data: Dict[str, Any]) -> str:
-    summary = {
-        "skills": (resume_data.get("skills") or [])[:20],
-        "top_experience": [
-            {
-                "title": item.get("title"),
-                "company": item.get("company"),
-                "achievements": (item.get("achievements") or [])[:2],
-            }
-            for item in (resume_data.get("work_experience") or [])[:3]
-        ],
-        "education": [
-            {
-                "institution": item.get("institution"),
-                "degree": item.get("degree"),
-                "end_date": item.get("end_date") or item.get("graduation_year"),
-            }
-            for item in (resume_data.get("education") or [])[:2]
-        ],
-    }
-    return json.dumps(summary, ensure_ascii=False, indent=2)
-
-
-def _compose_resume_review_prompt(resume_text: str, resume_data: Dict[str, Any]) -> str:
+def _compose_resume_review_prompt(resume_text: str) -> str:
     return RESUME_REVIEW_PROMPT.format(
+        parse_schema=RESUME_PARSE_SCHEMA,
         schema=RESUME_REVIEW_SCHEMA,
         resume_text=_truncate_resume_text(resume_text),
-        resume_summary=_resume_summary_for_prompt(resume_data),
     )
 
 
-def _invoke_resume_review(prompt: str) -> Dict[str, Any]:
+def _invoke_resume_review(prompt: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     logger.info("Invoking AI for resume review")
     
     try:
-        base_messages = [
+        user_message = {"role": "user", "content": prompt}
+        messages = [
             {
                 "role": "system",
                 "content": "You are an ATS analyst. Reply with JSON only; no hidden fields, no markdown.",
             },
-            {"role": "user", "content": prompt},
+            user_message,
         ]
 
         reminders = [
@@ -750,24 +825,30 @@ def _invoke_resume_review(prompt: str) -> Dict[str, Any]:
         for attempt, reminder in enumerate(reminders, start=1):
             logger.info(f"Resume review attempt {attempt}/{len(reminders)}")
             
-            messages = list(base_messages)
             if attempt > 1:
-                messages[-1] = {"role": "user", "content": f"{prompt}\n\nREMINDER: {reminder}"}
+                user_message["content"] = f"{prompt}\n\nREMINDER: {reminder}"
 
             response = client.chat.completions.create(
                 model=CHAT_MODEL,
                 messages=messages,
-                max_tokens=900,
+                max_tokens=2000,
                 temperature=0.2,
                 response_format={"type": "json_object"},
             )
             answer = getattr(response.choices[0].message, "content", "") or ""
             answer = re.sub(r"<think>.*?</think>", "", answer, flags=re.S)
             try:
-                payload = _load_json(answer)
-                if not isinstance(payload, dict):
+                envelope = _load_json(answer)
+                if not isinstance(envelope, dict):
                     logger.warning(f"AI did not return a JSON object on attempt {attempt}")
-                    raise ValueError(f"AI did not return a JSON object: {payload!r}")
+                    raise ValueError(f"AI did not return a JSON object: {envelope!r}")
+
+                parsed = envelope.get("parsed")
+                payload = envelope.get("review")
+                if not isinstance(parsed, dict) or not isinstance(payload, dict):
+                    logger.warning(f"AI payload missing parsed/review objects on attempt {attempt}")
+                    snippet = json.dumps(envelope, ensure_ascii=False)[:400]
+                    raise ValueError(f"AI payload must contain 'parsed' and 'review' objects | raw: {snippet}")
 
                 required_keys = {
                     "ats_score", "overall_feedback", "weak_sections", "phrasing_suggestions", "missing_keywords", "quick_fixes"
@@ -780,7 +861,7 @@ def _invoke_resume_review(prompt: str) -> Dict[str, Any]:
 
                 result = ResumeReviewResult.parse_obj(payload)
                 logger.info(f"✅ Resume review completed successfully on attempt {attempt}")
-                return result.dict()
+                return _normalize_parsed_resume(parsed), result.dict()
             except ValueError as exc:
                 last_error = exc
                 logger.warning(f"Resume review attempt {attempt} failed: {exc}")
@@ -801,9 +882,9 @@ async def review_resume_with_ai(resume_text: str) -> Dict[str, Any]:
             logger.warning("Resume text is empty or missing")
             raise ValueError("Resume text is required for review.")
 
-        resume_data = await asyncio.to_thread(parse_resume_with_ai, resume_text)
-        prompt = _compose_resume_review_prompt(resume_text, resume_data)
-        review = await asyncio.to_thread(_invoke_resume_review, prompt)
+        # One round-trip returns both the structured resume and the review.
+        prompt = _compose_resume_review_prompt(resume_text)
+        resume_data, review = await asyncio.to_thread(_invoke_resume_review, prompt)
         review["resume_snapshot"] = {
             "skills": resume_data.get("skills", []),
             "education": resume_data.get("education", []),
@@ -824,24 +905,49 @@ async def review_resume_with_ai(resume_text: str) -> Dict[str, Any]:
 # Public orchestration API
 # ---------------------------------------------------------------------------
 
+async def _cached_to_thread(kind: str, key: str, func: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    cached = await parse_cache.get_cached(kind, key)
+    if cached is not None:
+        return cached
+    result = await asyncio.to_thread(func, *args, **kwargs)
+    await parse_cache.set_cached(kind, key, result)
+    return result
+
+
+def _score_with_suggestions(
+    resume_data: Dict[str, Any],
+    job_data: Dict[str, Any],
+    resume_text: str,
+    job_description: str,
+) -> Dict[str, Any]:
+    scoring = score_resume_against_job(resume_data, job_data, resume_text=resume_text)
+    missing_summary = _summarize_missing_items(scoring["breakdown"])
+    scoring["suggestions"] = _generate_suggestions(resume_text, job_description, missing_summary)
+    return scoring
+
+
 async def analyze_resume_with_ai(resume_text: str, job_description: str) -> Dict[str, Any]:
     logger.info("Starting resume analysis with AI")
     
     try:
-        resume_task = asyncio.to_thread(parse_resume_with_ai, resume_text)
-        job_task = asyncio.to_thread(parse_job_description_with_ai, job_description)
+        resume_hash = _content_hash(resume_text)
+        job_hash = _content_hash(job_description)
+
+        resume_task = parse_resume_with_ai.persisted(resume_text, resume_hash)
+        job_task = parse_job_description_with_ai.persisted(job_description, job_hash)
         resume_data, job_data = await asyncio.gather(resume_task, job_task)
 
-        scoring = await asyncio.to_thread(
-            score_resume_against_job,
+        # Scores also depend on the embedding deployment, so it is part of the key.
+        scoring = await _cached_to_thread(
+            "analysis",
+            f"{EMBEDDING_MODEL}:{resume_hash}:{job_hash}",
+            _score_with_suggestions,
             resume_data,
             job_data,
-            resume_text=resume_text,
+            resume_text,
+            job_description,
         )
-        missing_summary = _summarize_missing_items(scoring["breakdown"])
-        suggestions = _generate_suggestions(resume_text, job_description, missing_summary)
 
-        scoring["suggestions"] = suggestions
         scoring["resume_snapshot"] = {
             "skills": resume_data.get("skills", []),
             "education": resume_data.get("education", []),
@@ -857,10 +963,13 @@ async def analyze_resume_with_ai(resume_text: str, job_description: str) -> Dict
         raise
 
 
-def embed_for_matching(texts: List[str]) -> List[List[float]]:
+def embed_for_matching(texts: List[str]) -> np.ndarray:
+    """Embed texts as unit-length float16 rows, so similarity is a plain dot product."""
     logger.info(f"Embedding {len(texts)} text(s) for matching")
     try:
-        result = _batched_embeddings(texts)
+        # Unit vectors sit in [-1, 1], so half precision halves the memory
+        # traffic of the matching path at negligible cosine error.
+        result = _normalize_rows(_batched_embeddings(texts)).astype(np.float16)
         logger.info(f"✅ Embeddings for matching generated successfully")
         return result
     except Exception as e:
@@ -868,5 +977,36 @@ def embed_for_matching(texts: List[str]) -> List[List[float]]:
         raise
 
 
-def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
-    return _cosine_similarity(vec_a, vec_b)
\ No newline at end of file
+def cosine_similarity(vec_a: Any, vec_b: Any) -> float:
+    return _cosine_similarity(vec_a, vec_b)
+
+
+def cosine_similarity_normalized(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
+    """Cosine similarity of two vectors already normalized by embed_for_matching."""
+    # Accumulate in float32 even when the stored vectors are float16.
+    return float(np.dot(np.asarray(vec_a, dtype=np.float32), np.asarray(vec_b, dtype=np.float32)))
+
+
+def pack_embedding(vector: Any) -> Binary:
+    """Pack an embedding as raw float32 bytes for storage in Mongo."""
+    return Binary(np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+
+
+def unpack_embedding(value: Any) -> Optional[np.ndarray]:
+    """Read a stored embedding (packed bytes or a legacy list of floats) as a float32 vector."""
+    if not value:
+        return None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def cosine_similarity_matrix(queries: Any, corpus: Any) -> np.ndarray:
+    """Return the (len(queries), len(corpus)) cosine similarity matrix in one matmul."""
+    # float16 inputs are upcast here so the kernels accumulate in float32.
+    query_matrix = np.ascontiguousarray(queries, dtype=np.float32)
+    corpus_matrix = np.ascontiguousarray(corpus, dtype=np.float32)
+    if simsimd is not None:
+        distances = simsimd.cdist(query_matrix, corpus_matrix, metric="cosine")
+        return 1.0 - np.asarray(distances, dtype=np.float32)
+    return _normalize_rows(query_matrix) @ _normalize_rows(corpus_matrix).T
\ No newline at end of file
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+try:
+    import faiss
+except ImportError:  # pragma: no cover
+    faiss = None
+
+from database import jobs_collection
+from services.ai_service import unpack_embedding
+from utils.clock import utcnow
+from utils.logger import logger
+
+INDEX_DIR = Path(os.getenv("JOB_INDEX_DIR", str(Path(__file__).resolve().parent.parent / "data" / "job_index")))
+INDEX_PATH = INDEX_DIR / "jobs.faiss"
+IDS_PATH = INDEX_DIR / "jobs.ids.json"
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+
+_INDEXED_QUERY = {"status": {"$ne": "closed"}, "embedding": {"$exists": True}}
+
+
+class _IndexState(NamedTuple):
+    index: "faiss.Index"
+    job_ids: List[str]
+    # Build start time, and how many embedded open jobs the build scanned.
+    built_at: datetime
+    source_count: int
+
+
+# Swapped as one tuple so searches never see a half-rebuilt set.
+_state: Optional[_IndexState] = None
+# Set when no usable index is on disk, so searches don't hit the filesystem on
+# every request; cleared by the next rebuild.
+_missing = False
+
+
+def _build_index(matrix: np.ndarray) -> "faiss.Index":
+    index = faiss.IndexHNSWFlat(matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efSearch = HNSW_EF_SEARCH
+    index.add(matrix)
+    return index
+
+
+def _persist(state: _IndexState) -> None:
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_index = INDEX_PATH.with_suffix(".faiss.tmp")
+    tmp_ids = IDS_PATH.with_suffix(".json.tmp")
+    faiss.write_index(state.index, str(tmp_index))
+    manifest = {
+        "built_at": state.built_at.isoformat(),
+        "source_count": state.source_count,
+        "job_ids": state.job_ids,
+    }
+    tmp_ids.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp_index, INDEX_PATH)
+    os.replace(tmp_ids, IDS_PATH)
+
+
+def load_job_index() -> bool:
+    """Load the persisted job index from disk; returns False when none is usable."""
+    global _state
+    if faiss is None or not INDEX_PATH.exists() or not IDS_PATH.exists():
+        return False
+
+    try:
+        index = faiss.read_index(str(INDEX_PATH))
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        manifest = json.loads(IDS_PATH.read_text(encoding="utf-8"))
+        job_ids = manifest["job_ids"]
+        _state = _IndexState(
+            index,
+            job_ids,
+            datetime.fromisoformat(manifest["built_at"]),
+            manifest.get("source_count", len(job_ids)),
+        )
+        logger.info(f"✅ Loaded job index with {len(job_ids)} vectors from {INDEX_PATH}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to load job index: {e}", exc_info=True)
+        return False
+
+
+async def _index_outdated(state: _IndexState) -> bool:
+    # New or re-embedded jobs carry a newer embedding_updated_at; closed jobs
+    # drop out of the count.
+    newer = await jobs_collection.find_one(
+        {**_INDEXED_QUERY, "embedding_updated_at": {"$gt": state.built_at}},
+        {"_id": 1},
+    )
+    if newer is not None:
+        return True
+    return await jobs_collection.count_documents(_INDEXED_QUERY) != state.source_count
+
+
+async def rebuild_job_index() -> int:
+    """Rebuild the HNSW index from every open job's stored embedding and persist it.
+
+    Skipped when the set of embedded open jobs is unchanged since the last build.
+    """
+    global _state, _missing
+    if faiss is None:
+        logger.info("faiss not installed, skipping job index rebuild")
+        return 0
+
+    try:
+        if _state is None:
+            load_job_index()
+        if _state is not None and not await _index_outdated(_state):
+            logger.info("Job embeddings unchanged since last build, skipping job index rebuild")
+            return len(_state.job_ids)
+
+        logger.info("Rebuilding job embedding index")
+        # Taken before the scan so embeddings written during it count as newer.
+        built_at = utcnow()
+        source_count = 0
+        rows: List[np.ndarray] = []
+        job_ids: List[str] = []
+        cursor = jobs_collection.find(_INDEXED_QUERY, {"embedding": 1}).batch_size(500)
+        async for doc in cursor:
+            source_count += 1
+            vector = unpack_embedding(doc.get("embedding"))
+            if vector is None or (rows and vector.shape != rows[0].shape):
+                continue
+            rows.append(vector)
+            job_ids.append(str(doc["_id"]))
+
+        if not rows:
+            logger.warning("No job embeddings available to index")
+            return 0
+
+        matrix = np.vstack(rows).astype(np.float32)
+        faiss.normalize_L2(matrix)
+        index = await asyncio.to_thread(_build_index, matrix)
+        state = _IndexState(index, job_ids, built_at, source_count)
+        await asyncio.to_thread(_persist, state)
+        _state = state
+        _missing = False
+        logger.info(f"✅ Job index rebuilt with {len(job_ids)} vectors")
+        return len(job_ids)
+
+    except Exception as e:
+        logger.error(f"❌ Failed to rebuild job index: {e}", exc_info=True)
+        raise
+
+
+def search_job_ids(vector: np.ndarray, k: int) -> Optional[Tuple[List[str], datetime]]:
+    """Return up to k nearest job ids plus the index build time, or None when no index is loaded."""
+    global _missing
+    if _state is None:
+        if _missing:
+            return None
+        if not load_job_index():
+            _missing = True
+            return None
+
+    index, job_ids, built_at, _ = _state
+    # Copy: stored vectors are read-only views over the Mongo bytes, and
+    # normalize_L2 works in place.
+    query = np.array(vector, dtype=np.float32, copy=True).reshape(1, -1)
+    if query.shape[1] != index.d:
+        logger.warning(f"Query dimension {query.shape[1]} does not match job index dimension {index.d}")
+        return None
+
+    faiss.normalize_L2(query)
+    _, labels = index.search(query, k)
+    return [job_ids[label] for label in labels[0] if label >= 0], built_at
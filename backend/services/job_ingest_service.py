@@ -1,13 +1,18 @@
-﻿import inspect
+﻿import asyncio
 import time
-from typing import Dict, Iterable, List, Any
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
 from utils.logger import logger
 from services import recommendation_service
 from services.scrapers import job_scraper
+from services.scrapers.job_scraper import JobPayload
 
-SCRAPERS: Dict[str, callable] = {
-    "adzuna": job_scraper.fetch_latest,
+UPSERT_BATCH_SIZE = 500
+
+# Each fetcher is registered with an is_async flag so run_scraper can dispatch
+# without probing the return value.
+SCRAPERS: Dict[str, Tuple[Callable[..., Any], bool]] = {
+    "adzuna": (job_scraper.fetch_realtime, False),
 }
 
 def available_sources() -> List[str]:
@@ -22,35 +27,50 @@ async def run_scraper(source: str, filters: Dict[str, Any] = None) -> List[str]:
     """
     logger.info(f"Running scraper for source='{source}' with filters={filters or {}}")
 
-    fetcher = SCRAPERS.get(source)
-    if not fetcher:
+    entry = SCRAPERS.get(source)
+    if not entry:
         raise ValueError(f"Unknown scraper source '{source}'. Available: {', '.join(available_sources())}")
 
+    fetcher, is_async = entry
     filters = filters or {}
-    result = fetcher(**filters)
-    jobs = await result if inspect.isawaitable(result) else result
+    if is_async:
+        jobs = await fetcher(**filters)
+    else:
+        # Sync fetchers do blocking HTTP, so keep them off the event loop.
+        jobs = await asyncio.to_thread(fetcher, **filters)
 
     if not isinstance(jobs, Iterable):
         raise ValueError(f"Scraper '{source}' returned an invalid payload")
 
     inserted_ids: List[str] = []
     total, success = 0, 0
+    batch: List[Dict[str, Any]] = []
+
+    async def _flush() -> None:
+        nonlocal success
+        try:
+            job_ids = await recommendation_service.upsert_jobs_bulk(batch)
+            inserted_ids.extend(job_ids)
+            success += len(job_ids)
+        except Exception as e:
+            logger.error(f"Failed to insert {len(batch)} jobs from '{source}': {e}")
+        batch.clear()
 
     for job in jobs:
         total += 1
-        payload = dict(job or {})
+        payload = job.to_dict() if isinstance(job, JobPayload) else dict(job or {})
         description = payload.get("description")
         if not description:
             continue
         payload.setdefault("source", source)
         payload.setdefault("metadata", {})
         payload.setdefault("last_seen_active", payload.get("collected_at"))
-        try:
-            job_id = await recommendation_service.upsert_job(payload)
-            inserted_ids.append(job_id)
-            success += 1
-        except Exception as e:
-            logger.error(f"Failed to insert job from '{source}': {e}")
+        batch.append(payload)
+        if len(batch) >= UPSERT_BATCH_SIZE:
+            await _flush()
+
+    if batch:
+        await _flush()
 
     elapsed = round(time.time() - start_time, 2)
     logger.info(f"Scraper '{source}' completed — {success}/{total} jobs processed in {elapsed}s")
@@ -60,16 +80,22 @@ async def run_multiple(sources: Iterable[str], filters: Dict[str, Any] = None) -
     """
     Run multiple scrapers in one go.
     """
+    sources = list(sources)
     logger.info(f"Running multiple scrapers: {', '.join(sources)}")
     start_time = time.time()
     summary: Dict[str, List[str]] = {}
 
-    for source in sources:
-        try:
-            summary[source] = await run_scraper(source, filters)
-        except Exception as e:
-            logger.error(f"Error running scraper '{source}': {e}")
+    # Scrapers are independent I/O-bound fetches, so run them side by side.
+    results = await asyncio.gather(
+        *(run_scraper(source, filters) for source in sources),
+        return_exceptions=True,
+    )
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error running scraper '{source}': {result}")
             summary[source] = []
+        else:
+            summary[source] = result
 
     logger.info(f"All scrapers completed in {round(time.time() - start_time, 2)}s")
     return summary
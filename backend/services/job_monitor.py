@@ -1,10 +1,10 @@
 ﻿import asyncio
 import os
 from datetime import datetime, timedelta
-from typing import Optional
-from bson import ObjectId
+from typing import Any, Dict, List, Optional
 
 from database import job_user_collection, jobs_collection
+from services.job_index import rebuild_job_index
 from utils.logger import logger
 
 CHECK_INTERVAL_SECONDS = int(os.getenv("JOB_MONITOR_INTERVAL", str(24 * 60 * 60)))
@@ -13,32 +13,34 @@ STALE_AFTER_DAYS = int(os.getenv("JOB_STALE_AFTER_DAYS", "14"))
 _monitor_task: Optional[asyncio.Task] = None
 
 
-async def _record_status_change(job_id: str, status: str, reason: str) -> None:
+async def _record_status_change(job_ids: List[str], status: str, reason: str) -> None:
     payload = {
         "status": status,
         "reason": reason,
         "timestamp": datetime.utcnow(),
     }
     await job_user_collection.update_many(
-        {"job_id": job_id},
+        {"job_id": {"$in": job_ids}},
         {"$push": {"status_history": payload}},
     )
-    logger.info(f"Recorded status change for job_id={job_id}, status={status}, reason={reason}")
+    logger.info(f"Recorded status change for {len(job_ids)} jobs, status={status}, reason={reason}")
 
 
-async def _mark_job(job_id: str, status: str, reason: str) -> None:
-    try:
-        oid = ObjectId(job_id)
-    except Exception:
-        logger.warning(f"Invalid job id encountered while marking status: {job_id}")
-        return
+async def _mark_jobs(query: Dict[str, Any], status: str, reason: str) -> int:
+    # Resolve ids first so the status_history push targets exactly the jobs
+    # this update changes.
+    cursor = jobs_collection.find(query, {"_id": 1}).batch_size(500)
+    oids = [doc["_id"] async for doc in cursor]
+    if not oids:
+        return 0
 
-    await jobs_collection.update_one(
-        {"_id": oid},
+    await jobs_collection.update_many(
+        {"_id": {"$in": oids}},
         {"$set": {"status": status, "last_status_change": datetime.utcnow()}},
     )
-    await _record_status_change(job_id, status, reason)
-    logger.info(f"Job {job_id} marked as {status} ({reason})")
+    await _record_status_change([str(oid) for oid in oids], status, reason)
+    logger.info(f"{len(oids)} jobs marked as {status} ({reason})")
+    return len(oids)
 
 
 async def run_monitor_cycle() -> None:
@@ -46,25 +48,29 @@ async def run_monitor_cycle() -> None:
     stale_threshold = now - timedelta(days=STALE_AFTER_DAYS)
     logger.info("Running job monitor cycle...")
 
-    cursor = jobs_collection.find({"status": {"$ne": "closed"}}).limit(200)
-    jobs = await cursor.to_list(length=200)
-    logger.info(f"Fetched {len(jobs)} active jobs for monitoring check.")
-
-    for job in jobs:
-        job_id = str(job.get("_id"))
-        metadata = job.get("metadata") if isinstance(job.get("metadata"), dict) else {}
-        source_status = str(metadata.get("source_status", ""))
-        last_seen = job.get("last_seen_active")
-
-        if source_status.lower() == "closed":
-            await _mark_job(job_id, "closed", "source_reported_closed")
-            continue
+    closed = await _mark_jobs(
+        {
+            "status": {"$ne": "closed"},
+            "metadata.source_status": {"$regex": "^closed$", "$options": "i"},
+        },
+        "closed",
+        "source_reported_closed",
+    )
+    stale = await _mark_jobs(
+        {
+            "status": {"$nin": ["closed", "stale"]},
+            "last_seen_active": {"$lt": stale_threshold},
+        },
+        "stale",
+        "stale_last_seen",
+    )
 
-        if isinstance(last_seen, datetime) and last_seen < stale_threshold:
-            await _mark_job(job_id, "stale", "stale_last_seen")
-            continue
+    try:
+        await rebuild_job_index()
+    except Exception as exc:
+        logger.error(f"Job index rebuild failed: {exc}", exc_info=True)
 
-    logger.info("Job monitor cycle completed.")
+    logger.info(f"Job monitor cycle completed ({closed} closed, {stale} stale).")
 
 
 async def _monitor_loop() -> None:
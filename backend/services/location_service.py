@@ -1,33 +1,74 @@
+import bisect
 import csv
+import heapq
 from pathlib import Path
 from typing import List
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # pragma: no cover
+    pa = None
 from utils.logger import logger
 
 DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "locations.csv"
 _locations: List[str] = []
+_locations_lower: List[str] = []
+# Lowercased labels in sorted order plus each one's index into _locations,
+# so prefix queries resolve with two bisects instead of a full scan.
+_locations_sorted_lower: List[str] = []
+_sort_index: List[int] = []
+
+
+def _read_labels_with_arrow() -> List[str]:
+    columns = ["city", "city_ascii", "country"]
+    table = pacsv.read_csv(
+        DATA_PATH,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types={name: pa.string() for name in columns},
+            strings_can_be_null=True,
+        ),
+    )
+    city = pc.utf8_trim_whitespace(pc.coalesce(table["city_ascii"], table["city"]))
+    country = pc.utf8_trim_whitespace(table["country"])
+    labels = pc.if_else(pc.is_null(country), city, pc.binary_join_element_wise(city, country, ", "))
+    return labels.filter(pc.is_valid(city)).to_pylist()
+
+
+def _read_labels_with_csv() -> List[str]:
+    labels: List[str] = []
+    with open(DATA_PATH, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            city = row.get("city_ascii") or row.get("city")
+            country = row.get("country")
+            if city:
+                labels.append(f"{city.strip()}, {country.strip()}" if country else city.strip())
+    return labels
 
 
 def load_locations_from_csv(force: bool = False) -> List[str]:
     """Load all locations from CSV into memory."""
-    global _locations
+    global _locations, _locations_lower, _locations_sorted_lower, _sort_index
 
     if force or not _locations:
         logger.info("Loading locations from CSV...")
         _locations = []
+        _locations_lower = []
 
         if not DATA_PATH.exists():
             logger.error(f"locations.csv not found at {DATA_PATH}")
             raise FileNotFoundError(f"locations.csv not found at {DATA_PATH}")
 
         try:
-            with open(DATA_PATH, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    city = row.get("city_ascii") or row.get("city")
-                    country = row.get("country")
-                    if city:
-                        label = f"{city.strip()}, {country.strip()}" if country else city.strip()
-                        _locations.append(label)
+            if pa is not None:
+                _locations = _read_labels_with_arrow()
+            else:
+                _locations = _read_labels_with_csv()
+            _locations_lower = [label.lower() for label in _locations]
+            _sort_index = sorted(range(len(_locations_lower)), key=_locations_lower.__getitem__)
+            _locations_sorted_lower = [_locations_lower[idx] for idx in _sort_index]
             logger.info(f"Loaded {len(_locations)} locations from {DATA_PATH}")
         except Exception as exc:
             logger.exception(f"Failed to load locations: {exc}")
@@ -43,6 +84,19 @@ def search_locations(query: str, limit: int = 8) -> List[str]:
         load_locations_from_csv()
 
     q = query.lower().strip()
-    results = [loc for loc in _locations if q in loc.lower()]
+
+    # Prefix matches first, kept in CSV order so the most prominent cities lead.
+    start = bisect.bisect_left(_locations_sorted_lower, q)
+    end = bisect.bisect_left(_locations_sorted_lower, q + "\U0010ffff", lo=start)
+    prefix_indices = heapq.nsmallest(limit, _sort_index[start:end])
+    results = [_locations[idx] for idx in prefix_indices]
+
+    if len(results) < limit:
+        seen = set(prefix_indices)
+        for idx, low in enumerate(_locations_lower):
+            if q in low and idx not in seen:
+                results.append(_locations[idx])
+                if len(results) >= limit:
+                    break
     logger.info(f"Found {len(results)} matches for query='{query}' (limit={limit})")
-    return results[:limit]
+    return results
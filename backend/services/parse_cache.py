@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from database import ai_cache_collection
+from utils.logger import logger
+
+
+def _cache_id(kind: str, key: str) -> str:
+    return f"{kind}:{key}"
+
+
+async def get_cached(kind: str, key: str) -> Optional[Dict[str, Any]]:
+    """Return the stored AI result for (kind, key), or None on a miss."""
+    try:
+        doc = await ai_cache_collection.find_one({"_id": _cache_id(kind, key)}, {"value": 1})
+    except Exception as e:
+        # A cache outage should only cost an extra model call.
+        logger.warning(f"AI cache lookup failed for kind={kind}: {e}")
+        return None
+    if not doc:
+        return None
+    logger.info(f"Using persisted {kind} result")
+    return doc.get("value")
+
+
+async def set_cached(kind: str, key: str, value: Dict[str, Any]) -> None:
+    """Persist an AI result; entries expire through the TTL index on created_at.
+
+    Parsed resumes are stored whole, including the candidate's contact details
+    and history, so they live only as long as AI_CACHE_TTL_SECONDS (30 days).
+    """
+    try:
+        await ai_cache_collection.update_one(
+            {"_id": _cache_id(kind, key)},
+            {"$set": {"value": value, "created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"AI cache write failed for kind={kind}: {e}")
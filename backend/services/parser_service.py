@@ -1,5 +1,14 @@
+import asyncio
+import hashlib
+import math
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional
+from zipfile import ZipFile
 import docx
+from lxml import etree
 try:
     import fitz  # PyMuPDF
 except ImportError:  # pragma: no cover
@@ -13,8 +22,67 @@ try:
 except ImportError:
     win32 = None
 from services.ai_service import parse_resume_with_ai
+from services.pdf_worker import extract_pdf_range
+from utils.cache import LRUCache
 from utils.logger import logger
 
+# Character-level replacements happen in one C-level translate() pass;
+# runs of the resulting spaces are collapsed by _RE_WS afterwards.
+_SANITIZE_TRANS = str.maketrans({"\ufffd": " ", "\t": " ", "\x0b": " ", "\x0c": " ", "\r": " "})
+_RE_WS = re.compile(r"  +")
+_RE_BLANK = re.compile(r"\n{3,}")
+_RE_RTF_HEX = re.compile(r"\\'[0-9a-fA-F]{2}")
+_RE_RTF_CTRL = re.compile(r"\\[a-zA-Z]+-?\d* ?")
+
+# PyMuPDF documents are not thread-safe, so long PDFs are split into page
+# ranges that worker processes open independently (see services.pdf_worker). Resume-sized files stay
+# serial; only documents past the threshold go to the shared pool, which uses
+# spawned workers because forking a threaded server can deadlock.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_MAX_WORKERS = min(8, os.cpu_count() or 1)
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = f"{_W_NS}p"
+_W_T = f"{_W_NS}t"
+_W_TAB = f"{_W_NS}tab"
+_W_TABS = f"{_W_NS}tabs"
+# Run-level breaks rendered the way python-docx's Paragraph.text does.
+_W_BREAKS = {_W_TAB: "\t", f"{_W_NS}br": "\n", f"{_W_NS}cr": "\n"}
+
+TEXT_CACHE_SIZE = int(os.getenv("TEXT_CACHE_SIZE", "128"))
+_text_cache = LRUCache(maxsize=TEXT_CACHE_SIZE)
+
+
+def start_pdf_pool() -> None:
+    """Create the shared PDF extraction pool; call once at application startup."""
+    global _pdf_pool
+    if _pdf_pool is None and PDF_MAX_WORKERS >= 2:
+        _pdf_pool = ProcessPoolExecutor(max_workers=PDF_MAX_WORKERS, mp_context=get_context("spawn"))
+
+
+def shutdown_pdf_pool() -> None:
+    """Shut down the shared PDF extraction pool; call once at application shutdown."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=True, cancel_futures=True)
+        _pdf_pool = None
+
+
+def _extract_pdf_text(file_path: str) -> str:
+    pool = _pdf_pool
+    with fitz.open(file_path) as pdf:
+        page_count = pdf.page_count
+        if pool is None or page_count < PDF_PARALLEL_MIN_PAGES:
+            return "\n".join(page.get_text("text") or "" for page in pdf)
+
+    step = math.ceil(page_count / PDF_MAX_WORKERS)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    logger.info(f"Extracting {page_count} PDF pages across {len(starts)} worker processes")
+    parts = pool.map(extract_pdf_range, [file_path] * len(starts), starts, stops)
+    return "\n".join(parts)
+
 
 def sanitize_text(text: str) -> str:
     logger.info("Sanitizing extracted text")
@@ -24,10 +92,9 @@ def sanitize_text(text: str) -> str:
             logger.info("Text is empty, returning empty string")
             return ""
         
-        cleaned = text.replace("\ufffd", " ")
-        cleaned = re.sub(r"[\t\x0b\x0c\r]+", " ", cleaned)
-        cleaned = re.sub(r"[ ]{2,}", " ", cleaned)
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+        cleaned = text.translate(_SANITIZE_TRANS)
+        cleaned = _RE_WS.sub(" ", cleaned)
+        cleaned = _RE_BLANK.sub("\n\n", cleaned)
         result = cleaned.strip()
         
         logger.info(f"✅ Text sanitized successfully (length: {len(result)} chars)")
@@ -38,8 +105,46 @@ def sanitize_text(text: str) -> str:
         raise
 
 
+def _extract_docx_text(file_path: str) -> str:
+    # Stream word/document.xml instead of building python-docx's object model.
+    paragraphs = []
+    with ZipFile(file_path) as archive, archive.open("word/document.xml") as handle:
+        for _, element in etree.iterparse(handle, tag=_W_P, resolve_entities=False, no_network=True):
+            parts = []
+            for node in element.iter(_W_T, *_W_BREAKS):
+                if node.tag == _W_T:
+                    parts.append(node.text or "")
+                elif node.tag != _W_TAB or node.getparent().tag != _W_TABS:
+                    # w:tab inside w:tabs is a tab-stop definition, not content.
+                    parts.append(_W_BREAKS[node.tag])
+            paragraphs.append("".join(parts))
+            element.clear()
+    return "\n".join(paragraphs)
+
+
 def extract_text_from_file(file_path: str) -> str:
     """Extract raw text from supported resume file formats."""
+    try:
+        with open(file_path, "rb") as handle:
+            digest = hashlib.blake2b(handle.read(), digest_size=16).hexdigest()
+    except Exception as e:
+        logger.error(f"❌ Failed to read file {file_path}: {e}", exc_info=True)
+        raise
+
+    # Re-uploads of the same bytes skip extraction; the extension is part of
+    # the key because it selects the parser.
+    key = (os.path.splitext(file_path.lower())[1], digest)
+    cached = _text_cache.get(key)
+    if cached is not None:
+        logger.info(f"Using cached text for file: {file_path}")
+        return cached
+
+    result = _extract_text_uncached(file_path)
+    _text_cache.set(key, result)
+    return result
+
+
+def _extract_text_uncached(file_path: str) -> str:
     logger.info(f"Extracting text from file: {file_path}")
     
     try:
@@ -50,11 +155,10 @@ def extract_text_from_file(file_path: str) -> str:
             
             if fitz is not None:
                 logger.info("Using PyMuPDF (fitz) for PDF extraction")
-                with fitz.open(file_path) as pdf:
-                    raw = "\n".join(page.get_text("text") or "" for page in pdf)
-                    result = sanitize_text(raw)
-                    logger.info(f"✅ PDF text extracted successfully using PyMuPDF ({len(result)} chars)")
-                    return result
+                raw = _extract_pdf_text(file_path)
+                result = sanitize_text(raw)
+                logger.info(f"✅ PDF text extracted successfully using PyMuPDF ({len(result)} chars)")
+                return result
             
             if pdfplumber is not None:
                 logger.info("Using pdfplumber for PDF extraction")
@@ -69,8 +173,12 @@ def extract_text_from_file(file_path: str) -> str:
         
         if suffix.endswith(".docx"):
             logger.info("Processing DOCX file")
-            doc = docx.Document(file_path)
-            raw = "\n".join(p.text for p in doc.paragraphs)
+            try:
+                raw = _extract_docx_text(file_path)
+            except Exception as exc:
+                logger.warning(f"Streaming DOCX parse failed, falling back to python-docx: {exc}")
+                doc = docx.Document(file_path)
+                raw = "\n".join(p.text for p in doc.paragraphs)
             result = sanitize_text(raw)
             logger.info(f"✅ DOCX text extracted successfully ({len(result)} chars)")
             return result
@@ -87,8 +195,8 @@ def extract_text_from_file(file_path: str) -> str:
             logger.info("Processing RTF file")
             with open(file_path, "r", encoding="utf-8", errors="ignore") as handle:
                 raw = handle.read()
-            text = re.sub(r"\\'[0-9a-fA-F]{2}", " ", raw)
-            text = re.sub(r"\\[a-zA-Z]+-?\d* ?", "", text)
+            text = _RE_RTF_HEX.sub(" ", raw)
+            text = _RE_RTF_CTRL.sub("", text)
             text = text.replace("{", " ").replace("}", " ")
             result = sanitize_text(text)
             logger.info(f"✅ RTF text extracted successfully ({len(result)} chars)")
@@ -125,6 +233,11 @@ def extract_text_from_file(file_path: str) -> str:
         raise
 
 
+async def aextract_text_from_file(file_path: str) -> str:
+    """Run extract_text_from_file in a worker thread so the event loop stays free."""
+    return await asyncio.to_thread(extract_text_from_file, file_path)
+
+
 def parse_resume_text(text: str) -> dict:
     """Use AI to turn raw resume text into structured fields."""
     logger.info("Parsing resume text with AI")
@@ -150,4 +263,9 @@ def parse_resume_text(text: str) -> dict:
             "education": [],
             "work_experience": [],
             "error": f"AI parsing failed: {exc}",
-        }
\ No newline at end of file
+        }
+
+
+async def aparse_resume_text(text: str) -> dict:
+    """Run parse_resume_text in a worker thread so the event loop stays free."""
+    return await asyncio.to_thread(parse_resume_text, text)
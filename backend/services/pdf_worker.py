@@ -0,0 +1,14 @@
+"""PDF page-range extraction for the spawned worker processes.
+
+Kept free of application imports so each worker loads only PyMuPDF, not the
+AI clients, database connections or logging setup that parser_service pulls in.
+"""
+try:
+    import fitz  # PyMuPDF
+except ImportError:  # pragma: no cover
+    fitz = None
+
+
+def extract_pdf_range(file_path: str, start: int, stop: int) -> str:
+    with fitz.open(file_path) as pdf:
+        return "\n".join(pdf[index].get_text("text") or "" for index in range(start, stop))
@@ -1,25 +1,90 @@
 ﻿import asyncio
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+import copy
+import hashlib
+import heapq
+import json
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
+import numpy as np
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from database import jobs_collection, job_user_collection, profiles_collection
 from models.preferences import GuestRecommendationRequest, PreferencePayload
-from services.ai_service import cosine_similarity, embed_for_matching
+from services.ai_service import cosine_similarity_matrix, embed_for_matching, pack_embedding, unpack_embedding
+from services.job_index import search_job_ids
+from utils.cache import LRUCache
+from utils.clock import pin_utcnow, utcnow
 from utils.logger import logger
 
 DEFAULT_LIMIT = 20
 MAX_CANDIDATES = 150
+ANN_CANDIDATES = MAX_CANDIDATES * 4
+MIN_ANN_CANDIDATES = 20
+# Share of the candidate budget reserved for jobs the ANN index can't know about yet.
+UNINDEXED_CANDIDATES = MAX_CANDIDATES // 4
+_PREF_KEYS = tuple(PreferencePayload.model_fields.keys())
+QUERY_CACHE_SIZE = 1024
+# Only these preference fields shape the Mongo query.
+QUERY_PREFERENCE_FIELDS = (
+    "locations",
+    "remote_ok",
+    "role_families",
+    "seniority_levels",
+    "industries_like",
+    "company_sizes",
+)
 SIMILARITY_WEIGHT = 70.0
 PREFERENCE_BONUS = 10.0
+EMBED_BATCH_SIZE = 32
+SKILL_PREVIEW_COUNT = 8
+
+# Fields read while ranking. Bulky display fields are left out and hydrated
+# only for the jobs that need them (see _hydrate_job_details).
+JOB_RANKING_PROJECTION = {
+    "title": 1,
+    "company": 1,
+    "locations": 1,
+    "work_modes": 1,
+    "categories": 1,
+    "levels": 1,
+    "skills": 1,
+    "status": 1,
+    "metadata": 1,
+    "embedding": 1,
+    "text_hash": 1,
+    "embedding_text_hash": 1,
+    "last_seen_active": 1,
+}
+JOB_DETAIL_PROJECTION = {
+    "summary": 1,
+    "description": 1,
+    "salary": 1,
+    "url": 1,
+    "source": 1,
+}
+# Recommendation lists only show the fit score; the full resume fit payload is
+# loaded per job by get_cached_resume_score.
+USER_STATE_PROJECTION = {
+    "job_id": 1,
+    "state": 1,
+    "resume_score_cache.score": 1,
+    "resume_score_cache.updated_at": 1,
+    "_id": 0,
+}
+
+_query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE)
 
 
 def _normalize_strings(values: Optional[List[str]]) -> List[str]:
     unique: List[str] = []
+    seen = set()
     for item in values or []:
         cleaned = (item or "").strip()
-        if cleaned and cleaned.lower() not in [existing.lower() for existing in unique]:
+        key = cleaned.lower()
+        if cleaned and key not in seen:
+            seen.add(key)
             unique.append(cleaned)
     return unique
 
@@ -67,7 +132,7 @@ def _profile_to_text(profile: Dict[str, Any]) -> str:
 
 
 def _job_to_text(job: Dict[str, Any]) -> str:
-    logger.info(f"Converting job to text representation for job_id={job.get('_id')}")
+    logger.debug("Converting job to text representation for job_id=%s", job.get("_id"))
     
     try:
         chunks: List[str] = [job.get("title", ""), job.get("company", "")]
@@ -83,7 +148,7 @@ def _job_to_text(job: Dict[str, Any]) -> str:
             chunks.append("Levels: " + ", ".join(job.get("levels", [])))
 
         result = " \n".join(filter(None, chunks))
-        logger.info(f"✅ Job converted to text ({len(result)} chars)")
+        logger.debug("Job converted to text (%d chars)", len(result))
         return result
     
     except Exception as e:
@@ -91,7 +156,7 @@ def _job_to_text(job: Dict[str, Any]) -> str:
         raise
 
 
-async def _embed_text(text: str) -> Optional[List[float]]:
+async def _embed_text(text: str) -> Optional[np.ndarray]:
     logger.info("Embedding text")
     
     try:
@@ -101,7 +166,7 @@ async def _embed_text(text: str) -> Optional[List[float]]:
             return None
         
         vectors = await asyncio.to_thread(embed_for_matching, [snippet])
-        result = vectors[0] if vectors else None
+        result = vectors[0] if len(vectors) else None
         logger.info(f"✅ Text embedded successfully")
         return result
     
@@ -110,24 +175,61 @@ async def _embed_text(text: str) -> Optional[List[float]]:
         raise
 
 
-async def _ensure_resume_embedding(profile: Dict[str, Any]) -> Optional[List[float]]:
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _job_text_hash(job: Dict[str, Any]) -> str:
+    return _text_hash(_job_to_text(job).strip())
+
+
+def _job_embedding_is_current(job: Dict[str, Any]) -> bool:
+    # text_hash is written at ingest, so a re-ingested job whose text changed
+    # no longer matches the hash its embedding was made from.
+    text_hash = job.get("text_hash")
+    return text_hash is None or text_hash == job.get("embedding_text_hash")
+
+
+def _embedding_is_current(doc: Dict[str, Any], embedded_at_key: str) -> bool:
+    updated_at = doc.get("updated_at")
+    embedded_at = doc.get(embedded_at_key)
+    return updated_at is None or (embedded_at is not None and embedded_at >= updated_at)
+
+
+async def _ensure_resume_embedding(profile: Dict[str, Any]) -> Optional[np.ndarray]:
     user_id = profile.get("user_id")
     logger.info(f"Ensuring resume embedding for user_id={user_id}")
     
     try:
-        cached = profile.get("resume_embedding")
-        if isinstance(cached, list) and cached:
+        cached = unpack_embedding(profile.get("resume_embedding"))
+        if cached is not None and _embedding_is_current(profile, "resume_embedding_updated_at"):
             logger.info(f"Using cached resume embedding for user_id={user_id}")
             return cached
 
-        logger.info(f"Generating new resume embedding for user_id={user_id}")
         resume_text = _profile_to_text(profile)
+        text_hash = _text_hash(resume_text)
+        if cached is not None and profile.get("resume_embedding_text_hash") == text_hash:
+            # The profile was saved without touching any embedded field.
+            logger.info(f"Resume text unchanged, refreshing embedding timestamp for user_id={user_id}")
+            await profiles_collection.update_one(
+                {"user_id": user_id},
+                {"$set": {"resume_embedding_updated_at": utcnow()}},
+            )
+            return cached
+
+        logger.info(f"Generating new resume embedding for user_id={user_id}")
         vector = await _embed_text(resume_text)
         
-        if vector:
+        if vector is not None:
             await profiles_collection.update_one(
                 {"user_id": user_id},
-                {"$set": {"resume_embedding": vector, "resume_embedding_updated_at": datetime.utcnow()}},
+                {
+                    "$set": {
+                        "resume_embedding": pack_embedding(vector),
+                        "resume_embedding_text_hash": text_hash,
+                        "resume_embedding_updated_at": utcnow(),
+                    }
+                },
                 upsert=True,
             )
             logger.info(f"✅ Resume embedding cached for user_id={user_id}")
@@ -141,26 +243,34 @@ async def _ensure_resume_embedding(profile: Dict[str, Any]) -> Optional[List[flo
         raise
 
 
-async def _ensure_job_embedding(job: Dict[str, Any]) -> Optional[List[float]]:
+async def _ensure_job_embedding(job: Dict[str, Any]) -> Optional[np.ndarray]:
     job_id = job.get("_id")
-    logger.info(f"Ensuring job embedding for job_id={job_id}")
+    logger.debug("Ensuring job embedding for job_id=%s", job_id)
     
     try:
-        cached = job.get("embedding")
-        if isinstance(cached, list) and cached:
-            logger.info(f"Using cached job embedding for job_id={job_id}")
+        cached = unpack_embedding(job.get("embedding"))
+        if cached is not None and _job_embedding_is_current(job):
+            logger.debug("Using cached job embedding for job_id=%s", job_id)
             return cached
 
-        logger.info(f"Generating new job embedding for job_id={job_id}")
+        logger.debug("Generating new job embedding for job_id=%s", job_id)
         text = _job_to_text(job)
         vector = await _embed_text(text)
         
-        if vector:
+        if vector is not None:
+            text_hash = _job_text_hash(job)
             await jobs_collection.update_one(
                 {"_id": job_id},
-                {"$set": {"embedding": vector, "embedding_updated_at": datetime.utcnow()}},
+                {
+                    "$set": {
+                        "embedding": pack_embedding(vector),
+                        "text_hash": text_hash,
+                        "embedding_text_hash": text_hash,
+                        "embedding_updated_at": utcnow(),
+                    }
+                },
             )
-            logger.info(f"✅ Job embedding cached for job_id={job_id}")
+            logger.debug("Job embedding cached for job_id=%s", job_id)
         else:
             logger.warning(f"No embedding generated for job_id={job_id}")
         
@@ -171,7 +281,112 @@ async def _ensure_job_embedding(job: Dict[str, Any]) -> Optional[List[float]]:
         raise
 
 
+async def _bulk_write_jobs(operations: List[UpdateOne]) -> Dict[str, int]:
+    # Unordered, so one bad document only drops its own write; the rest of the
+    # batch is applied and the failures are logged rather than raised.
+    if not operations:
+        return {"upserted": 0, "modified": 0, "failed": 0}
+
+    try:
+        result = await jobs_collection.bulk_write(operations, ordered=False)
+        return {"upserted": result.upserted_count, "modified": result.modified_count, "failed": 0}
+    except BulkWriteError as e:
+        details = e.details or {}
+        failed = len(details.get("writeErrors", []))
+        logger.warning(f"Bulk write to jobs partially failed: {failed} of {len(operations)} operations rejected")
+        return {"upserted": details.get("nUpserted", 0), "modified": details.get("nModified", 0), "failed": failed}
+
+
+async def _hydrate_job_details(jobs: List[Dict[str, Any]]) -> None:
+    pending = [job for job in jobs if "description" not in job]
+    if not pending:
+        return
+
+    logger.info(f"Hydrating details for {len(pending)} jobs")
+    try:
+        by_id = {job["_id"]: job for job in pending}
+        cursor = jobs_collection.find({"_id": {"$in": list(by_id)}}, JOB_DETAIL_PROJECTION)
+        async for doc in cursor:
+            by_id[doc["_id"]].update(doc)
+        # Jobs without these fields still count as hydrated.
+        for job in pending:
+            job.setdefault("description", None)
+    
+    except Exception as e:
+        logger.error(f"❌ Failed to hydrate job details: {e}", exc_info=True)
+        raise
+
+
+async def _ensure_job_embeddings(jobs: List[Dict[str, Any]]) -> int:
+    logger.info(f"Ensuring job embeddings for {len(jobs)} jobs")
+    
+    try:
+        without_vectors = [
+            job for job in jobs
+            if unpack_embedding(job.get("embedding")) is None or not _job_embedding_is_current(job)
+        ]
+        # The embedding text includes the description, which the ranking fetch omits.
+        await _hydrate_job_details(without_vectors)
+
+        missing: List[Tuple[Dict[str, Any], str]] = []
+        for job in without_vectors:
+            text = _job_to_text(job).strip()
+            if text:
+                missing.append((job, text))
+
+        if not missing:
+            logger.info("All job embeddings already cached")
+            return 0
+
+        now = utcnow()
+        operations: List[UpdateOne] = []
+        for start in range(0, len(missing), EMBED_BATCH_SIZE):
+            chunk = missing[start:start + EMBED_BATCH_SIZE]
+            vectors = await asyncio.to_thread(embed_for_matching, [text for _, text in chunk])
+            for (job, text), vector in zip(chunk, vectors):
+                packed = pack_embedding(vector)
+                text_hash = _text_hash(text)
+                job["embedding"] = packed
+                operations.append(
+                    UpdateOne(
+                        {"_id": job["_id"]},
+                        {
+                            "$set": {
+                                "embedding": packed,
+                                "text_hash": text_hash,
+                                "embedding_text_hash": text_hash,
+                                "embedding_updated_at": now,
+                            }
+                        },
+                    )
+                )
+
+        await _bulk_write_jobs(operations)
+        logger.info(f"✅ Embedded and cached {len(operations)} jobs")
+        return len(operations)
+    
+    except Exception as e:
+        logger.error(f"❌ Failed to ensure job embeddings: {e}", exc_info=True)
+        raise
+
+
+def _query_cache_key(preferences: PreferencePayload) -> str:
+    fields = {name: getattr(preferences, name, None) for name in QUERY_PREFERENCE_FIELDS}
+    encoded = json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
 def _base_job_query(preferences: PreferencePayload) -> Dict[str, Any]:
+    key = _query_cache_key(preferences)
+    query = _query_cache.get(key)
+    if query is None:
+        query = _build_base_job_query(preferences)
+        _query_cache.set(key, query)
+    # Callers add per-request clauses, so never hand out the cached dict.
+    return copy.deepcopy(query)
+
+
+def _build_base_job_query(preferences: PreferencePayload) -> Dict[str, Any]:
     logger.info("Building base job query from preferences")
     
     try:
@@ -203,13 +418,36 @@ def _base_job_query(preferences: PreferencePayload) -> Dict[str, Any]:
         raise
 
 
-async def _load_jobs(preferences: PreferencePayload) -> List[Dict[str, Any]]:
-    logger.info(f"Loading jobs with max candidates={MAX_CANDIDATES}")
+def _candidate_object_ids(job_ids: List[str]) -> List[Any]:
+    return [ObjectId(job_id) if ObjectId.is_valid(job_id) else job_id for job_id in job_ids]
+
+
+async def _load_jobs(
+    preferences: PreferencePayload,
+    candidate_ids: Optional[List[str]] = None,
+    extra_filter: Optional[Dict[str, Any]] = None,
+    limit: int = MAX_CANDIDATES,
+) -> List[Dict[str, Any]]:
+    logger.info(f"Loading jobs with max candidates={limit}")
     
     try:
         query = _base_job_query(preferences)
-        cursor = jobs_collection.find(query).sort("last_seen_active", -1).limit(MAX_CANDIDATES)
-        jobs = await cursor.to_list(length=MAX_CANDIDATES)
+        if candidate_ids is not None:
+            query["_id"] = {"$in": _candidate_object_ids(candidate_ids)}
+        if extra_filter:
+            query = {"$and": [query, extra_filter]}
+        pipeline: List[Dict[str, Any]] = [{"$match": query}]
+        if candidate_ids is None:
+            pipeline += [{"$sort": {"last_seen_active": -1}}, {"$limit": limit}]
+        pipeline.append({"$project": JOB_RANKING_PROJECTION})
+        cursor = jobs_collection.aggregate(pipeline, allowDiskUse=False)
+        jobs = await cursor.to_list(length=None)
+        if candidate_ids is not None:
+            # Keep the ANN similarity order rather than recency; $in matches
+            # come back unordered.
+            position = {job_id: rank for rank, job_id in enumerate(candidate_ids)}
+            jobs.sort(key=lambda job: position.get(str(job["_id"]), len(position)))
+            jobs = jobs[:limit]
         logger.info(f"✅ Loaded {len(jobs)} jobs")
         return jobs
     
@@ -225,24 +463,38 @@ def _extract_profile_skills(profile: Dict[str, Any]) -> List[str]:
     return []
 
 
-def _evaluate_preferences(job: Dict[str, Any], preferences: PreferencePayload, profile_skills: List[str]) -> Tuple[float, List[str]]:
-    logger.info(f"Evaluating preferences for job_id={job.get('_id')}")
+def _lowered(values: Optional[List[str]]) -> FrozenSet[str]:
+    return frozenset(item.lower() for item in values or [])
+
+
+def _preference_context(preferences: PreferencePayload, profile_skills: List[str]) -> Dict[str, FrozenSet[str]]:
+    # Lowercased once per ranking call instead of once per candidate job.
+    return {
+        "roles": _lowered(preferences.role_families),
+        "levels": _lowered(preferences.seniority_levels),
+        "industries_like": _lowered(preferences.industries_like),
+        "industries_avoid": _lowered(preferences.industries_avoid),
+        "company_sizes": _lowered(preferences.company_sizes),
+        "profile_skills": _lowered(profile_skills),
+    }
+
+
+def _evaluate_preferences(job: Dict[str, Any], pref_ctx: Dict[str, FrozenSet[str]]) -> Tuple[float, List[str]]:
+    logger.debug("Evaluating preferences for job_id=%s", job.get("_id"))
     
     try:
         score = 0.0
         reasons: List[str] = []
 
-        categories = set(item.lower() for item in job.get("categories", []))
-        if preferences.role_families:
-            overlap = categories.intersection(item.lower() for item in preferences.role_families)
-            if overlap:
+        if pref_ctx["roles"]:
+            categories = set(item.lower() for item in job.get("categories", []))
+            if not pref_ctx["roles"].isdisjoint(categories):
                 score += PREFERENCE_BONUS
                 reasons.append("Matches preferred role focus")
 
-        levels = set(item.lower() for item in job.get("levels", []))
-        if preferences.seniority_levels:
-            overlap = levels.intersection(item.lower() for item in preferences.seniority_levels)
-            if overlap:
+        if pref_ctx["levels"]:
+            levels = set(item.lower() for item in job.get("levels", []))
+            if not pref_ctx["levels"].isdisjoint(levels):
                 score += PREFERENCE_BONUS
                 reasons.append("Requested seniority level")
 
@@ -250,31 +502,27 @@ def _evaluate_preferences(job: Dict[str, Any], preferences: PreferencePayload, p
         if isinstance(job.get("metadata"), dict):
             industries = set(item.lower() for item in job["metadata"].get("industry", []))
             company_size = str(job["metadata"].get("company_size", "")).lower()
-            if preferences.company_sizes and company_size:
-                if any(company_size == item.lower() for item in preferences.company_sizes):
-                    score += PREFERENCE_BONUS
-                    reasons.append("Preferred company size")
-
-        if preferences.industries_like:
-            overlap = industries.intersection(item.lower() for item in preferences.industries_like)
-            if overlap:
+            if company_size and company_size in pref_ctx["company_sizes"]:
                 score += PREFERENCE_BONUS
-                reasons.append("Preferred industry")
-        if preferences.industries_avoid:
-            avoid = industries.intersection(item.lower() for item in preferences.industries_avoid)
-            if avoid:
-                score -= PREFERENCE_BONUS
-                reasons.append("Industry on avoid list")
-
-        job_skills = set(item.lower() for item in job.get("skills", []))
-        profile_skill_set = set(item.lower() for item in profile_skills)
-        if job_skills and profile_skill_set:
-            overlap = job_skills.intersection(profile_skill_set)
+                reasons.append("Preferred company size")
+
+        if not pref_ctx["industries_like"].isdisjoint(industries):
+            score += PREFERENCE_BONUS
+            reasons.append("Preferred industry")
+        if not pref_ctx["industries_avoid"].isdisjoint(industries):
+            score -= PREFERENCE_BONUS
+            reasons.append("Industry on avoid list")
+
+        if pref_ctx["profile_skills"]:
+            job_skills = set(item.lower() for item in job.get("skills", []))
+            overlap = job_skills.intersection(pref_ctx["profile_skills"])
             if overlap:
                 score += PREFERENCE_BONUS
-                reasons.append(f"Skill overlap: {', '.join(sorted(list(overlap)))[:60]}")
+                # The preview shows only the first SKILL_PREVIEW_COUNT names alphabetically.
+                preview = heapq.nsmallest(SKILL_PREVIEW_COUNT, overlap)
+                reasons.append(f"Skill overlap: {', '.join(preview)[:60]}")
 
-        logger.info(f"✅ Preferences evaluated: score={score}, reasons={len(reasons)}")
+        logger.debug("Preferences evaluated: score=%s, reasons=%d", score, len(reasons))
         return score, reasons
     
     except Exception as e:
@@ -282,43 +530,72 @@ def _evaluate_preferences(job: Dict[str, Any], preferences: PreferencePayload, p
         raise
 
 
+def _stack_job_matrix(jobs: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[int]]:
+    rows: List[np.ndarray] = []
+    indices: List[int] = []
+    for idx, job in enumerate(jobs):
+        vector = unpack_embedding(job.get("embedding"))
+        if vector is not None:
+            rows.append(vector)
+            indices.append(idx)
+
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32), indices
+    return np.vstack(rows).astype(np.float32, copy=False), indices
+
+
 async def _rank_jobs(
     jobs: List[Dict[str, Any]],
     preferences: PreferencePayload,
     profile: Dict[str, Any],
-    resume_vector: Optional[List[float]],
+    resume_vector: Optional[np.ndarray],
 ) -> List[Dict[str, Any]]:
     logger.info(f"Ranking {len(jobs)} jobs")
     
     try:
         ranked: List[Dict[str, Any]] = []
-        profile_skills = _extract_profile_skills(profile)
-
-        for job in jobs:
-            reasons: List[str] = []
-            pref_score, pref_reasons = _evaluate_preferences(job, preferences, profile_skills)
-            reasons.extend(pref_reasons)
-
-            sim_score = 0.0
-            if resume_vector:
-                job_vector = await _ensure_job_embedding(job)
-                if job_vector:
-                    similarity = cosine_similarity(resume_vector, job_vector)
-                    if similarity > 0:
-                        sim_score = similarity * SIMILARITY_WEIGHT
-                        reasons.append(f"Resume alignment {int(similarity * 100)}%")
-
-            total_score = min(100.0, max(0.0, sim_score + pref_score))
+        pref_ctx = _preference_context(preferences, _extract_profile_skills(profile))
+
+        similarities = np.zeros(len(jobs), dtype=np.float32)
+        has_vector = np.zeros(len(jobs), dtype=bool)
+        new_embeddings = 0
+        if resume_vector is not None:
+            new_embeddings = await _ensure_job_embeddings(jobs)
+
+            # One batched cosine call (simsimd cdist, or a numpy GEMV when it
+            # is unavailable) replaces a dot product per job.
+            job_matrix, indices = _stack_job_matrix(jobs)
+            if indices:
+                similarities[indices] = cosine_similarity_matrix(resume_vector[None, :], job_matrix)[0]
+                has_vector[indices] = True
+
+        evaluations = [_evaluate_preferences(job, pref_ctx) for job in jobs]
+        pref_scores = np.fromiter((score for score, _ in evaluations), dtype=np.float64, count=len(jobs))
+
+        # Score every candidate in one vectorized pass; only the reason strings
+        # still need a per-job loop.
+        sims = similarities.astype(np.float64)
+        aligned = has_vector & (sims > 0)
+        sim_scores = np.where(aligned, sims * SIMILARITY_WEIGHT, 0.0)
+        totals = np.clip(sim_scores + pref_scores, 0.0, 100.0).round(2)
+
+        for idx, job in enumerate(jobs):
+            reasons = evaluations[idx][1]
+            if aligned[idx]:
+                reasons.append(f"Resume alignment {int(sims[idx] * 100)}%")
             ranked.append(
                 {
                     "job": job,
-                    "score": round(total_score, 2),
+                    "score": float(totals[idx]),
                     "reasons": reasons,
                 }
             )
 
         ranked.sort(key=lambda item: item["score"], reverse=True)
-        logger.info(f"✅ Jobs ranked successfully, top score={ranked[0]['score'] if ranked else 0}")
+        logger.info(
+            f"✅ Ranked {len(ranked)} jobs, {int(has_vector.sum()) - new_embeddings} cached embeddings, "
+            f"{new_embeddings} new embeddings, top score={ranked[0]['score'] if ranked else 0}"
+        )
         return ranked
     
     except Exception as e:
@@ -330,7 +607,7 @@ async def _fetch_user_states(user_id: str) -> Dict[str, Dict[str, Any]]:
     logger.info(f"Fetching user states for user_id={user_id}")
     
     try:
-        cursor = job_user_collection.find({"user_id": user_id})
+        cursor = job_user_collection.find({"user_id": user_id}, USER_STATE_PROJECTION)
         records = await cursor.to_list(length=None)
         mapping: Dict[str, Dict[str, Any]] = {}
         for record in records:
@@ -382,6 +659,37 @@ def _serialize_job_result(entry: Dict[str, Any], user_states: Dict[str, Dict[str
     return response
 
 
+async def _load_candidate_jobs(preferences: PreferencePayload, resume_vector: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+    # Narrow the Mongo scan to the ANN neighbourhood of the resume when the job
+    # index is available; fall back to the plain preference query otherwise.
+    if resume_vector is not None:
+        hit = await asyncio.to_thread(search_job_ids, resume_vector, ANN_CANDIDATES)
+        if hit and hit[0]:
+            candidate_ids, built_at = hit
+            # The index only holds jobs embedded before its last build. Also
+            # load the recent jobs it cannot know about, so they get ranked,
+            # embedded, and picked up by the next rebuild.
+            unindexed_filter = {
+                "$or": [
+                    {"embedding": {"$exists": False}},
+                    {"embedding_updated_at": {"$gt": built_at}},
+                ]
+            }
+            indexed, unindexed = await asyncio.gather(
+                _load_jobs(preferences, candidate_ids),
+                _load_jobs(preferences, extra_filter=unindexed_filter, limit=UNINDEXED_CANDIDATES),
+            )
+            if len(indexed) >= MIN_ANN_CANDIDATES:
+                # The newest unindexed jobs, then the nearest neighbours, within
+                # the usual candidate budget.
+                seen = {job["_id"] for job in unindexed}
+                nearest = [job for job in indexed if job["_id"] not in seen]
+                return unindexed + nearest[: MAX_CANDIDATES - len(unindexed)]
+            logger.info(f"ANN returned only {len(indexed)} matching jobs, falling back to full query")
+    return await _load_jobs(preferences)
+
+
+@pin_utcnow
 async def recommend_for_user(user_id: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
     logger.info(f"Generating recommendations for user_id={user_id}, limit={limit}")
     
@@ -396,19 +704,30 @@ async def recommend_for_user(user_id: str, limit: int = DEFAULT_LIMIT) -> List[D
             logger.warning(f"No preferences found for user_id={user_id}")
             return []
 
-        payload = {key: preferences_data.get(key) for key in PreferencePayload.__fields__.keys()}
-        preferences = PreferencePayload.parse_obj(payload)
+        # Preferences were validated when saved, so skip re-validation; omit
+        # missing/None keys so construct() still applies field defaults.
+        payload = {key: preferences_data[key] for key in _PREF_KEYS if preferences_data.get(key) is not None}
+        preferences = PreferencePayload.model_construct(**payload)
 
-        resume_vector = await _ensure_resume_embedding(profile)
-        jobs = await _load_jobs(preferences)
+        async def _resume_and_candidates() -> Tuple[Optional[np.ndarray], List[Dict[str, Any]]]:
+            vector = await _ensure_resume_embedding(profile)
+            return vector, await _load_candidate_jobs(preferences, vector)
+
+        # User states only depend on user_id, so fetch them alongside the
+        # embedding/candidate chain instead of after ranking.
+        (resume_vector, jobs), user_states = await asyncio.gather(
+            _resume_and_candidates(),
+            _fetch_user_states(user_id),
+        )
         
         if not jobs:
             logger.info(f"No jobs found matching preferences for user_id={user_id}")
             return []
 
         ranked = await _rank_jobs(jobs, preferences, profile, resume_vector)
-        user_states = await _fetch_user_states(user_id)
-        results = [_serialize_job_result(entry, user_states) for entry in ranked[:limit]]
+        top = ranked[:limit]
+        await _hydrate_job_details([entry["job"] for entry in top])
+        results = [_serialize_job_result(entry, user_states) for entry in top]
         
         logger.info(f"✅ Generated {len(results)} recommendations for user_id={user_id}")
         return results
@@ -418,6 +737,7 @@ async def recommend_for_user(user_id: str, limit: int = DEFAULT_LIMIT) -> List[D
         raise
 
 
+@pin_utcnow
 async def recommend_for_guest(request: GuestRecommendationRequest) -> List[Dict[str, Any]]:
     logger.info(f"Generating guest recommendations with limit={request.limit}")
     
@@ -428,7 +748,7 @@ async def recommend_for_guest(request: GuestRecommendationRequest) -> List[Dict[
             "work_experience": [],
             "education": [],
         }
-        resume_vector: Optional[List[float]] = None
+        resume_vector: Optional[np.ndarray] = None
         
         if request.resume_snippets:
             logger.info(f"Embedding {len(request.resume_snippets)} resume snippets for guest")
@@ -441,7 +761,9 @@ async def recommend_for_guest(request: GuestRecommendationRequest) -> List[Dict[
             return []
 
         ranked = await _rank_jobs(jobs, preferences, profile_stub, resume_vector)
-        results = [_serialize_job_result(entry, {}) for entry in ranked[: request.limit]]
+        top = ranked[: request.limit]
+        await _hydrate_job_details([entry["job"] for entry in top])
+        results = [_serialize_job_result(entry, {}) for entry in top]
         
         logger.info(f"✅ Generated {len(results)} guest recommendations")
         return results
@@ -451,6 +773,14 @@ async def recommend_for_guest(request: GuestRecommendationRequest) -> List[Dict[
         raise
 
 
+async def get_resume_embedding(profile: Dict[str, Any]) -> Optional[np.ndarray]:
+    return await _ensure_resume_embedding(profile)
+
+
+async def get_job_embedding(job: Dict[str, Any]) -> Optional[np.ndarray]:
+    return await _ensure_job_embedding(job)
+
+
 async def get_job_detail(job_id: str) -> Optional[Dict[str, Any]]:
     logger.info(f"Fetching job detail for job_id={job_id}")
     
@@ -475,15 +805,17 @@ async def get_job_detail(job_id: str) -> Optional[Dict[str, Any]]:
         raise
 
 
+@pin_utcnow
 async def upsert_job(job_payload: Dict[str, Any]) -> str:
     source = job_payload.get("source")
     source_id = job_payload.get("source_id")
     logger.info(f"Upserting job from source={source}, source_id={source_id}")
     
     try:
-        now = datetime.utcnow()
+        now = utcnow()
         job_payload.setdefault("status", "active")
         job_payload.setdefault("last_seen_active", now)
+        job_payload["text_hash"] = _job_text_hash(job_payload)
         
         query = {"source": source, "source_id": source_id}
         existing = await jobs_collection.find_one(query, {"_id": 1})
@@ -507,6 +839,58 @@ async def upsert_job(job_payload: Dict[str, Any]) -> str:
         raise
 
 
+@pin_utcnow
+async def upsert_jobs_bulk(job_payloads: List[Dict[str, Any]]) -> List[str]:
+    logger.info(f"Bulk upserting {len(job_payloads)} jobs")
+    
+    try:
+        if not job_payloads:
+            return []
+
+        now = utcnow()
+        operations: List[UpdateOne] = []
+        keys: List[Tuple[Any, Any]] = []
+        for job_payload in job_payloads:
+            job_payload.setdefault("status", "active")
+            job_payload.setdefault("last_seen_active", now)
+            job_payload["text_hash"] = _job_text_hash(job_payload)
+            source = job_payload.get("source")
+            source_id = job_payload.get("source_id")
+            keys.append((source, source_id))
+            operations.append(
+                UpdateOne(
+                    {"source": source, "source_id": source_id},
+                    {"$set": job_payload, "$setOnInsert": {"created_at": now}},
+                    upsert=True,
+                )
+            )
+
+        counts = await _bulk_write_jobs(operations)
+
+        # upserted_ids only covers new documents, so resolve every key once.
+        ids_by_key: Dict[Tuple[Any, Any], str] = {}
+        source_ids_by_source: Dict[Any, List[Any]] = {}
+        for source, source_id in keys:
+            source_ids_by_source.setdefault(source, []).append(source_id)
+        for source, source_ids in source_ids_by_source.items():
+            cursor = jobs_collection.find(
+                {"source": source, "source_id": {"$in": source_ids}},
+                {"_id": 1, "source_id": 1},
+            )
+            async for doc in cursor:
+                ids_by_key[(source, doc.get("source_id"))] = str(doc["_id"])
+
+        job_ids = [ids_by_key[key] for key in keys if key in ids_by_key]
+        logger.info(
+            f"✅ Bulk upsert finished: {counts['upserted']} inserted, {counts['modified']} updated, {counts['failed']} failed"
+        )
+        return job_ids
+    
+    except Exception as e:
+        logger.error(f"❌ Failed to bulk upsert {len(job_payloads)} jobs: {e}", exc_info=True)
+        raise
+
+
 async def mark_job_status(job_id: str, status: str) -> None:
     logger.info(f"Marking job status for job_id={job_id}, status={status}")
     
@@ -519,7 +903,7 @@ async def mark_job_status(job_id: str, status: str) -> None:
         
         await jobs_collection.update_one(
             {"_id": oid}, 
-            {"$set": {"status": status, "last_status_change": datetime.utcnow()}}
+            {"$set": {"status": status, "last_status_change": utcnow()}}
         )
         logger.info(f"✅ Job status marked for job_id={job_id}, status={status}")
     
@@ -532,7 +916,7 @@ async def save_job_for_user(user_id: str, job_id: str, state: str) -> None:
     logger.info(f"Saving job for user_id={user_id}, job_id={job_id}, state={state}")
     
     try:
-        now = datetime.utcnow()
+        now = utcnow()
         await job_user_collection.update_one(
             {"user_id": user_id, "job_id": job_id},
             {
@@ -611,12 +995,27 @@ async def list_user_jobs(user_id: str) -> List[Dict[str, Any]]:
         logger.error(f"❌ Failed to list jobs for user_id={user_id}: {e}", exc_info=True)
         raise
 
+async def get_cached_resume_score(user_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+    logger.info(f"Fetching cached resume score for user_id={user_id}, job_id={job_id}")
+    
+    try:
+        record = await job_user_collection.find_one(
+            {"user_id": user_id, "job_id": job_id},
+            {"resume_score_cache": 1, "_id": 0},
+        )
+        return record.get("resume_score_cache") if record else None
+    
+    except Exception as e:
+        logger.error(f"❌ Failed to fetch cached resume score for user_id={user_id}, job_id={job_id}: {e}", exc_info=True)
+        raise
+
+
 async def cache_resume_score(user_id: str, job_id: str, payload: Dict[str, Any]) -> None:
     logger.info(f"Caching resume score for user_id={user_id}, job_id={job_id}")
     
     try:
         stored = dict(payload)
-        stored["updated_at"] = datetime.utcnow()
+        stored["updated_at"] = utcnow()
         await job_user_collection.update_one(
             {"user_id": user_id, "job_id": job_id},
             {"$set": {"resume_score_cache": stored}},
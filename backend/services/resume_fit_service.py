@@ -3,7 +3,8 @@ from typing import Any, Dict, List, Optional
 
 from database import profiles_collection
 from services import recommendation_service
-from services.ai_service import cosine_similarity
+from services.ai_service import cosine_similarity_normalized
+from utils.clock import pin_utcnow, utcnow
 from utils.logger import logger
 
 CACHE_TTL_HOURS = 24
@@ -16,24 +17,23 @@ def _collect_profile_skills(profile: Dict[str, Any]) -> List[str]:
     return []
 
 
-def _normalize_skill_set(values: List[str]) -> List[str]:
-    unique: List[str] = []
+def _normalize_skill_set(values: List[str]) -> Dict[str, str]:
+    # Keyed by lowercase so overlap checks need no second normalization pass;
+    # the first spelling seen is kept for display.
+    index: Dict[str, str] = {}
     for item in values:
         cleaned = (item or "").strip()
-        if cleaned and cleaned.lower() not in [existing.lower() for existing in unique]:
-            unique.append(cleaned)
-    return unique
+        if cleaned:
+            index.setdefault(cleaned.lower(), cleaned)
+    return index
 
 
-def _skill_overlap(profile_skills: List[str], job_skills: List[str]) -> Dict[str, List[str]]:
+def _skill_overlap(profile_skills: Dict[str, str], job_skills: Dict[str, str]) -> Dict[str, List[str]]:
     logger.info(f"Calculating skill overlap between {len(profile_skills)} profile skills and {len(job_skills)} job skills")
     
     try:
-        profile_set = {item.lower(): item for item in profile_skills}
-        job_set = {item.lower(): item for item in job_skills}
-
-        matched = [profile_set[key] for key in profile_set.keys() & job_set.keys()]
-        gaps = [job_set[key] for key in job_set.keys() - profile_set.keys()]
+        matched = [profile_skills[key] for key in profile_skills.keys() & job_skills.keys()]
+        gaps = [job_skills[key] for key in job_skills.keys() - profile_skills.keys()]
         
         result = {"matched": sorted(matched), "gaps": sorted(gaps)}
         logger.info(f"✅ Skill overlap calculated: {len(matched)} matched, {len(gaps)} gaps")
@@ -62,6 +62,7 @@ async def _load_profile(user_id: str) -> Optional[Dict[str, Any]]:
         raise
 
 
+@pin_utcnow
 async def compute_resume_fit(user_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
     job_id = job.get("_id")
     logger.info(f"Computing resume fit for user_id={user_id}, job_id={job_id}")
@@ -76,11 +77,11 @@ async def compute_resume_fit(user_id: str, job: Dict[str, Any]) -> Dict[str, Any
         job_vector = await recommendation_service.get_job_embedding(job)
 
         similarity = 0.0
-        if resume_vector and job_vector:
-            similarity = max(0.0, cosine_similarity(resume_vector, job_vector))
+        if resume_vector is not None and job_vector is not None:
+            similarity = max(0.0, cosine_similarity_normalized(resume_vector, job_vector))
             logger.info(f"Calculated similarity score: {similarity:.3f}")
         else:
-            logger.warning(f"Missing embeddings for similarity calculation (resume_vector={bool(resume_vector)}, job_vector={bool(job_vector)})")
+            logger.warning(f"Missing embeddings for similarity calculation (resume_vector={resume_vector is not None}, job_vector={job_vector is not None})")
 
         profile_skills = _normalize_skill_set(_collect_profile_skills(profile))
         job_skills = _normalize_skill_set(job.get("skills", []))
@@ -104,7 +105,7 @@ async def compute_resume_fit(user_id: str, job: Dict[str, Any]) -> Dict[str, Any
             "summary": " | ".join(summary_bits)[:400],
             "matched": overlap["matched"],
             "gaps": overlap["gaps"],
-            "last_calculated": datetime.utcnow(),
+            "last_calculated": utcnow(),
         }
         
         logger.info(f"✅ Resume fit computed successfully for user_id={user_id}, job_id={job_id}: score={payload['score']}")
@@ -126,7 +127,7 @@ async def get_or_create_resume_fit(user_id: str, job_id: str) -> Dict[str, Any]:
         if cached:
             timestamp = cached.get("updated_at") or cached.get("last_calculated")
             if isinstance(timestamp, datetime):
-                age = datetime.utcnow() - timestamp
+                age = utcnow() - timestamp
                 if age < timedelta(hours=CACHE_TTL_HOURS):
                     logger.info(f"Using cached resume fit for user_id={user_id}, job_id={job_id} (age: {age})")
                     return cached
@@ -1,10 +1,21 @@
-﻿import json
-from typing import Optional
+﻿import asyncio
+import atexit
+import hashlib
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import httpx
-from bs4 import BeautifulSoup
+import orjson
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from lxml import html as lxml_html
 from readability import Document
 import trafilatura
+from utils.cache import LRUCache
 from utils.logger import logger
 
 DEFAULT_HEADERS = {
@@ -14,6 +25,138 @@ DEFAULT_HEADERS = {
     )
 }
 
+# Shared across calls so repeat hosts reuse pooled keep-alive / HTTP/2 connections.
+_CLIENT = httpx.Client(
+    timeout=15.0,
+    follow_redirects=True,
+    headers=DEFAULT_HEADERS,
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+)
+atexit.register(_CLIENT.close)
+
+# Pages are re-encoded to UTF-8 before parsing, so the parser must not trust
+# any <meta charset> they declare.
+_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+_RE_WORD = re.compile(r"\S+")
+# Plain str results: orjson rejects lxml's smart-string subclass.
+_JSONLD_XPATH = etree.XPath('//script[@type="application/ld+json"]/text()', smart_strings=False)
+# Compiled once and tried in priority order; a single union XPath would
+# return matches in document order and lose that priority.
+_HEURISTIC_SELECTORS = [
+    CSSSelector(css, translator="html")
+    for css in (
+        "#jobDescriptionText",
+        ".jobDescriptionText",
+        "#jobDescription",
+        ".job-description",
+        ".jobs-description__content",
+        "[data-testid='jobDescription']",
+        "[itemprop='description']",
+        "article",
+    )
+]
+
+BATCH_CONCURRENCY = 8
+STRATEGY_WORKERS = int(os.getenv("HTML_STRATEGY_WORKERS", "4"))
+_STRATEGY_POOL = ThreadPoolExecutor(max_workers=STRATEGY_WORKERS, thread_name_prefix="html-extract")
+STREAM_CHUNK_SIZE = 16384
+PARSE_CACHE_SIZE = int(os.getenv("HTML_PARSE_CACHE_SIZE", "512"))
+# Parsed description per page-content hash, wrapped in a 1-tuple so a cached
+# "nothing found" is distinguishable from a miss.
+_parse_cache = LRUCache(maxsize=PARSE_CACHE_SIZE)
+# url -> (ETag, Last-Modified, parsed description) for conditional GETs.
+_validators = LRUCache(maxsize=PARSE_CACHE_SIZE)
+# Created on first use so it binds to the running event loop; closed by
+# close_async_client() on app shutdown.
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            timeout=15.0,
+            follow_redirects=True,
+            headers=DEFAULT_HEADERS,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+        )
+    return _ASYNC_CLIENT
+
+
+async def close_async_client() -> None:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+
+class _JsonLdScanner:
+    """Incrementally parse streamed HTML, returning the first JSON-LD posting."""
+
+    def __init__(self, encoding: Optional[str]):
+        self._encoding = encoding or "utf-8"
+        self._chunks: List[bytes] = []
+        self._parser = etree.HTMLPullParser(events=("end",), encoding=self._encoding)
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        self._chunks.append(chunk)
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            if element.tag == "script" and element.get("type") == "application/ld+json":
+                try:
+                    description = _find_job_posting_description(orjson.loads(element.text or ""))
+                except orjson.JSONDecodeError:
+                    description = None
+                if description:
+                    return _clean_html(description)
+            # Only the events matter; drop finished subtrees to bound memory.
+            element.clear()
+        return None
+
+    def text(self) -> str:
+        return b"".join(self._chunks).decode(self._encoding, errors="replace")
+
+
+def _conditional_headers(url: str) -> Dict[str, str]:
+    entry: Optional[Tuple[Optional[str], Optional[str], Optional[str]]] = _validators.get(url)
+    if entry is None:
+        return {}
+    etag, last_modified, _ = entry
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _not_modified(url: str, response: httpx.Response) -> Tuple[bool, Optional[str]]:
+    if response.status_code != 304:
+        return False, None
+    entry = _validators.get(url)
+    return entry is not None, entry[2] if entry else None
+
+
+def _remember_validators(url: str, response: httpx.Response, description: Optional[str]) -> None:
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _validators.set(url, (etag, last_modified, description))
+
+
+def _parse_html_cached(html: str) -> Optional[str]:
+    key = hashlib.blake2b(html.encode("utf-8"), digest_size=16).digest()
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        logger.info("Using cached parse for identical page content")
+        return cached[0]
+
+    result = _parse_html(html)
+    _parse_cache.set(key, (result,))
+    return result
+
 
 def extract_job_description(url: str, *, timeout: float = 15.0) -> Optional[str]:
     """Return cleaned job description text for the given posting URL.
@@ -27,90 +170,173 @@ def extract_job_description(url: str, *, timeout: float = 15.0) -> Optional[str]
     logger.info(f"Extracting job description from URL: {url}")
     
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True, headers=DEFAULT_HEADERS) as client:
-            logger.info(f"Fetching URL with timeout={timeout}s")
-            response = client.get(url)
+        logger.debug("Fetching URL with timeout=%ss", timeout)
+        description: Optional[str] = None
+        with _CLIENT.stream("GET", url, timeout=timeout, headers=_conditional_headers(url)) as response:
+            unchanged, cached = _not_modified(url, response)
+            if unchanged:
+                logger.info(f"URL not modified, reusing cached description: {url}")
+                return cached
             response.raise_for_status()
-            html = response.text
-            logger.info(f"URL fetched successfully ({len(html)} chars)")
+            # JSON-LD usually sits in <head>, so stop downloading once a
+            # posting is found there.
+            scanner = _JsonLdScanner(response.charset_encoding)
+            for chunk in response.iter_bytes(STREAM_CHUNK_SIZE):
+                description = scanner.feed(chunk)
+                if description:
+                    break
+
+        if description:
+            logger.info(f"✅ Job description extracted via streamed JSON-LD ({len(description)} chars)")
+            _remember_validators(url, response, description)
+            return description
+
+        html = scanner.text()
+        logger.info(f"URL fetched successfully ({len(html)} chars)")
+
+        description = _parse_html_cached(html)
+        _remember_validators(url, response, description)
+        if not description:
+            logger.warning(f"No meaningful job description found for URL: {url}")
+        return description
+    
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ HTTP error fetching URL {url}: {e.response.status_code}", exc_info=True)
+        raise
+    except httpx.TimeoutException as e:
+        logger.error(f"❌ Timeout fetching URL {url}: {e}", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error(f"❌ Failed to extract job description from URL {url}: {e}", exc_info=True)
+        raise
 
-        soup = BeautifulSoup(html, "lxml")
+
+async def _fetch(url: str, timeout: float) -> httpx.Response:
+    return await _get_async_client().get(url, timeout=timeout, headers=_conditional_headers(url))
+
+
+async def extract_job_descriptions(
+    urls: List[str],
+    *,
+    concurrency: int = BATCH_CONCURRENCY,
+    timeout: float = 15.0,
+) -> List[Union[Optional[str], BaseException]]:
+    """Extract descriptions for many URLs concurrently.
+
+    Fetches are bounded by ``concurrency`` and parsing runs in worker threads.
+    Results follow the order of ``urls``; a failed URL yields its exception
+    instead of aborting the batch.
+    """
+    logger.info(f"Extracting job descriptions for {len(urls)} URLs (concurrency={concurrency})")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _extract(url: str) -> Optional[str]:
+        async with semaphore:
+            response = await _fetch(url, timeout)
+        unchanged, cached = _not_modified(url, response)
+        if unchanged:
+            return cached
+        response.raise_for_status()
+        description = await asyncio.to_thread(_parse_html_cached, response.text)
+        _remember_validators(url, response, description)
+        return description
+
+    results = await asyncio.gather(*(_extract(url) for url in urls), return_exceptions=True)
+    failed = sum(1 for result in results if isinstance(result, BaseException))
+    found = sum(1 for result in results if isinstance(result, str))
+    logger.info(f"✅ Batch extraction finished: {found} extracted, {failed} failed, {len(urls) - found - failed} empty")
+    return results
+
+
+def _parse_html(html: str) -> Optional[str]:
+    try:
+        if not html or not html.strip():
+            return None
+        tree = lxml_html.document_fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
 
         # Strategy 1: JSON-LD
-        logger.info("Attempting JSON-LD extraction")
-        description = _extract_from_json_ld(soup)
+        logger.debug("Attempting JSON-LD extraction")
+        description = _extract_from_json_ld(tree)
         if description:
             logger.info(f"✅ Job description extracted via JSON-LD ({len(description)} chars)")
             return description
 
-        # Strategy 2: Readability
-        logger.info("Attempting readability extraction")
-        doc = Document(html)
-        article_html = doc.summary(html_partial=True)
-        article_text = _clean_html(article_html)
-        if _meaningful(article_text):
-            logger.info(f"✅ Job description extracted via readability ({len(article_text)} chars)")
-            return article_text
-
-        # Strategy 3: Trafilatura
-        logger.info("Attempting trafilatura extraction")
-        traf_text = trafilatura.extract(html, favor_precision=True)
-        if _meaningful(traf_text):
-            logger.info(f"✅ Job description extracted via trafilatura ({len(traf_text)} chars)")
-            return traf_text
+        # Strategies 2 and 3: readability and trafilatura each walk the whole
+        # DOM, mostly inside lxml, so run them side by side and keep the longer
+        # result (readability wins ties).
+        logger.debug("Attempting readability and trafilatura extraction")
+        readability_future = _STRATEGY_POOL.submit(_readability_extract, html)
+        trafilatura_future = _STRATEGY_POOL.submit(trafilatura.extract, html, favor_precision=True)
+        candidates = [
+            ("readability", readability_future.result()),
+            ("trafilatura", trafilatura_future.result()),
+        ]
+        strategy, text = max(candidates, key=lambda candidate: len(candidate[1].split()) if candidate[1] else 0)
+        if _meaningful(text):
+            logger.info(f"✅ Job description extracted via {strategy} ({len(text)} chars)")
+            return text
 
         # Strategy 4: Heuristics
-        logger.info("Attempting heuristic extraction")
-        heuristic_result = _heuristic_extract(soup)
+        logger.debug("Attempting heuristic extraction")
+        heuristic_result = _heuristic_extract(tree)
         if heuristic_result:
             logger.info(f"✅ Job description extracted via heuristics ({len(heuristic_result)} chars)")
             return heuristic_result
         
-        logger.warning(f"No meaningful job description found for URL: {url}")
         return None
     
-    except httpx.HTTPStatusError as e:
-        logger.error(f"❌ HTTP error fetching URL {url}: {e.response.status_code}", exc_info=True)
-        raise
-    except httpx.TimeoutException as e:
-        logger.error(f"❌ Timeout fetching URL {url}: {e}", exc_info=True)
-        raise
     except Exception as e:
-        logger.error(f"❌ Failed to extract job description from URL {url}: {e}", exc_info=True)
+        logger.error(f"❌ Failed to parse job description HTML: {e}", exc_info=True)
         raise
 
 
-def _extract_from_json_ld(soup: BeautifulSoup) -> Optional[str]:
-    logger.info("Searching for JSON-LD job posting data")
+def _readability_extract(html: str) -> str:
+    return _clean_html(Document(html).summary(html_partial=True))
+
+
+def _is_job_posting(node: Dict[str, Any]) -> bool:
+    node_type = node.get("@type")
+    if isinstance(node_type, list):
+        return "JobPosting" in node_type
+    return node_type == "JobPosting"
+
+
+def _find_job_posting_description(payload: Any) -> Optional[str]:
+    # Breadth-first over every nested dict/list so postings wrapped in @graph,
+    # mainEntity, itemListElement, etc. are found, shallowest first.
+    queue = deque([payload])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, list):
+            queue.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        if _is_job_posting(node) and node.get("description"):
+            return node["description"]
+        queue.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    return None
+
+
+def _extract_from_json_ld(tree: etree._Element) -> Optional[str]:
+    logger.debug("Searching for JSON-LD job posting data")
     
     try:
         script_count = 0
-        for script in soup.find_all("script", type="application/ld+json"):
+        for script_text in _JSONLD_XPATH(tree):
             script_count += 1
             try:
-                payload = json.loads(script.string or "")
-            except json.JSONDecodeError:
-                logger.info(f"Skipping invalid JSON in script tag #{script_count}")
+                payload = orjson.loads(script_text or "")
+            except orjson.JSONDecodeError:
+                logger.debug("Skipping invalid JSON in script tag #%s", script_count)
                 continue
 
-            data_items = payload if isinstance(payload, list) else [payload]
-            for item in data_items:
-                if not isinstance(item, dict):
-                    continue
-                if item.get("@type") == "JobPosting":
-                    description = item.get("description")
-                    if description:
-                        logger.info(f"Found JobPosting in JSON-LD (script #{script_count})")
-                        return _clean_html(description)
-                if "@graph" in item and isinstance(item["@graph"], list):
-                    for sub_item in item["@graph"]:
-                        if isinstance(sub_item, dict) and sub_item.get("@type") == "JobPosting":
-                            description = sub_item.get("description")
-                            if description:
-                                logger.info(f"Found JobPosting in JSON-LD @graph (script #{script_count})")
-                                return _clean_html(description)
+            description = _find_job_posting_description(payload)
+            if description:
+                logger.debug("Found JobPosting in JSON-LD (script #%s)", script_count)
+                return _clean_html(description)
         
-        logger.info(f"No JobPosting found in {script_count} JSON-LD script(s)")
+        logger.debug("No JobPosting found in %s JSON-LD script(s)", script_count)
         return None
     
     except Exception as e:
@@ -118,30 +344,19 @@ def _extract_from_json_ld(soup: BeautifulSoup) -> Optional[str]:
         return None
 
 
-def _heuristic_extract(soup: BeautifulSoup) -> Optional[str]:
-    logger.info("Attempting heuristic extraction with CSS selectors")
+def _heuristic_extract(tree: etree._Element) -> Optional[str]:
+    logger.debug("Attempting heuristic extraction with CSS selectors")
     
     try:
-        selectors = [
-            "#jobDescriptionText",
-            ".jobDescriptionText",
-            "#jobDescription",
-            ".job-description",
-            ".jobs-description__content",
-            "[data-testid='jobDescription']",
-            "[itemprop='description']",
-            "article",
-        ]
-        
-        for selector in selectors:
-            node = soup.select_one(selector)
-            if node:
-                text = _clean_html(str(node))
+        for selector in _HEURISTIC_SELECTORS:
+            nodes = selector(tree)
+            if nodes:
+                text = _clean_html(nodes[0])
                 if _meaningful(text):
-                    logger.info(f"Heuristic match found with selector: {selector}")
+                    logger.debug("Heuristic match found with selector: %s", selector.css)
                     return text
         
-        logger.info("No heuristic selector matched")
+        logger.debug("No heuristic selector matched")
         return None
     
     except Exception as e:
@@ -149,16 +364,25 @@ def _heuristic_extract(soup: BeautifulSoup) -> Optional[str]:
         return None
 
 
-def _clean_html(fragment: str) -> str:
-    soup = BeautifulSoup(fragment or "", "lxml")
-    for bad in soup(["script", "style", "noscript", "footer", "header", "nav"]):
-        bad.extract()
-    parts = list(soup.stripped_strings)
-    return "\n".join(parts)
+_NON_CONTENT_TAGS = ("script", "style", "noscript", "footer", "header", "nav")
+
+
+def _clean_html(fragment: Union[str, etree._Element, None]) -> str:
+    # Nodes from the already-parsed page are cleaned in place; string
+    # fragments are parsed as an lxml fragment.
+    if isinstance(fragment, etree._Element):
+        tree = fragment
+    elif not fragment or not fragment.strip():
+        return ""
+    else:
+        tree = lxml_html.fragment_fromstring(fragment, create_parent="div")
+    etree.strip_elements(tree, etree.Comment, *_NON_CONTENT_TAGS, with_tail=False)
+    parts = (text.strip() for text in tree.itertext())
+    return "\n".join(part for part in parts if part)
 
 
 def _meaningful(text: Optional[str], *, min_words: int = 50) -> bool:
     if not text:
         return False
-    word_count = len(text.split())
-    return word_count >= min_words
\ No newline at end of file
+    # Stops scanning after min_words words instead of splitting the whole text.
+    return sum(1 for _ in islice(_RE_WORD.finditer(text), min_words)) >= min_words
\ No newline at end of file
@@ -1,12 +1,45 @@
-﻿import os
+﻿import asyncio
+import atexit
+import os
 import logging
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional
 
 import httpx
+from utils.cache import LRUCache
+from utils.clock import utcnow
 from utils.logger import logger
 
-JobPayload = Dict[str, Any]
+
+
+@dataclass(slots=True)
+class JobPayload:
+    """Normalized job listing as produced by the scrapers."""
+
+    source: str
+    source_id: str
+    title: Optional[str] = None
+    company: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+    locations: List[str] = field(default_factory=list)
+    work_modes: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    levels: List[str] = field(default_factory=list)
+    skills: List[str] = field(default_factory=list)
+    description: Optional[str] = None
+    salary: Dict[str, Any] = field(default_factory=dict)
+    url: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    last_seen_active: Optional[datetime] = None
+    collected_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Shallow on purpose: nested values are built fresh per job.
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
 
 # Adzuna API credentials
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
@@ -18,6 +51,81 @@ if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
 
 # Base API URL (US jobs for now)
 BASE_URL = "https://api.adzuna.com/v1/api/jobs/us/search/{page}"
+TELEPORT_BASE_URL = "https://api.teleport.org"
+
+# Shared read-only stand-in for missing nested objects in Adzuna results.
+_EMPTY = MappingProxyType({})
+_SORT_OPTIONS = frozenset({"date", "relevance", "salary"})
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+# How truthy filter arguments map onto Adzuna query values; None drops the param.
+_PARAM_COERCE = {
+    "full_time": lambda value: 1,
+    "contract": lambda value: 1,
+    "what_and": lambda value: "remote",
+    "sort_by": lambda value: value if value in _SORT_OPTIONS else None,
+}
+
+_FALLBACK_CITIES = tuple(
+    (city, city.lower())
+    for city in (
+        "New York, United States",
+        "San Francisco, United States",
+        "Los Angeles, United States",
+        "Seattle, United States",
+        "Chicago, United States",
+        "Boston, United States",
+        "Washington, United States",
+    )
+)
+SUGGESTION_CACHE_SIZE = 256
+_suggestion_cache = LRUCache(maxsize=SUGGESTION_CACHE_SIZE)
+
+# One pooled client per upstream host, reused across calls and closed at exit.
+_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+_ADZUNA_CLIENT = httpx.Client(timeout=15.0, http2=True, limits=_POOL_LIMITS)
+_TELEPORT_CLIENT = httpx.Client(base_url=TELEPORT_BASE_URL, timeout=10.0, http2=True, limits=_POOL_LIMITS)
+atexit.register(_ADZUNA_CLIENT.close)
+atexit.register(_TELEPORT_CLIENT.close)
+# Created on first use so it binds to the running event loop.
+_ASYNC_ADZUNA_CLIENT: Optional[httpx.AsyncClient] = None
+
+# fetch_realtime argument name -> Adzuna query parameter.
+_FILTER_ARGUMENTS = {
+    "what": "what",
+    "where": "where",
+    "max_days_old": "max_days_old",
+    "salary_min": "salary_min",
+    "salary_max": "salary_max",
+    "full_time": "full_time",
+    "contract": "contract",
+    "remote_only": "what_and",
+    "sort_by": "sort_by",
+}
+
+
+def _build_params(filters: Dict[str, Any], results_per_page: int) -> Dict[str, Any]:
+    params: Dict[str, Any] = {
+        "app_id": ADZUNA_APP_ID,
+        "app_key": ADZUNA_APP_KEY,
+        "results_per_page": results_per_page,
+        "content-type": "application/json",
+    }
+    for key, value in filters.items():
+        value = _PARAM_COERCE.get(key, _identity)(value) if value else None
+        if value is not None:
+            params[key] = value
+    return params
+
+
+def _normalize_results(data: Dict[str, Any]) -> List[JobPayload]:
+    now = utcnow()
+    now_iso = now.isoformat()
+    return [_normalize_job(job, now, now_iso) for job in data.get("results", [])]
 
 
 def fetch_realtime(
@@ -40,46 +148,26 @@ def fetch_realtime(
     logger.info(f"Fetching realtime jobs from Adzuna API (page={page}, results_per_page={results_per_page})")
     
     try:
-        params: Dict[str, Any] = {
-            "app_id": ADZUNA_APP_ID,
-            "app_key": ADZUNA_APP_KEY,
-            "results_per_page": results_per_page,
-            "content-type": "application/json",
+        filters = {
+            "what": what,
+            "where": where,
+            "max_days_old": max_days_old,
+            "salary_min": salary_min,
+            "salary_max": salary_max,
+            "full_time": full_time,
+            "contract": contract,
+            "what_and": remote_only,
+            "sort_by": sort_by,
         }
-
-        if what:
-            params["what"] = what
-        if where:
-            params["where"] = where
-        if max_days_old:
-            params["max_days_old"] = max_days_old
-        if salary_min:
-            params["salary_min"] = salary_min
-        if salary_max:
-            params["salary_max"] = salary_max
-        if full_time:
-            params["full_time"] = 1
-        if contract:
-            params["contract"] = 1
-        if remote_only:
-            params["what_and"] = "remote"
-        if sort_by in {"date", "relevance", "salary"}:
-            params["sort_by"] = sort_by
+        params = _build_params(filters, results_per_page)
 
         logger.info(f"Adzuna API filters: what={what}, where={where}, max_days_old={max_days_old}, remote_only={remote_only}, sort_by={sort_by}")
 
         url = BASE_URL.format(page=page)
 
-        with httpx.Client(timeout=15.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-        jobs: List[JobPayload] = []
-        results = data.get("results", [])
-        
-        for job in results:
-            jobs.append(_normalize_job(job))
+        response = _ADZUNA_CLIENT.get(url, params=params)
+        response.raise_for_status()
+        jobs = _normalize_results(response.json())
 
         logger.info(f"✅ Fetched and normalized {len(jobs)} jobs from Adzuna (page={page})")
         return jobs
@@ -95,15 +183,73 @@ def fetch_realtime(
         raise
 
 
-def _normalize_job(job: Dict[str, Any]) -> JobPayload:
+def _get_async_adzuna_client() -> httpx.AsyncClient:
+    global _ASYNC_ADZUNA_CLIENT
+    if _ASYNC_ADZUNA_CLIENT is None or _ASYNC_ADZUNA_CLIENT.is_closed:
+        _ASYNC_ADZUNA_CLIENT = httpx.AsyncClient(timeout=15.0, http2=True, limits=_POOL_LIMITS)
+    return _ASYNC_ADZUNA_CLIENT
+
+
+async def close_async_client() -> None:
+    global _ASYNC_ADZUNA_CLIENT
+    if _ASYNC_ADZUNA_CLIENT is not None:
+        await _ASYNC_ADZUNA_CLIENT.aclose()
+        _ASYNC_ADZUNA_CLIENT = None
+
+
+async def fetch_realtime_pages(
+    pages: List[int],
+    *,
+    results_per_page: int = 20,
+    **filters: Any,
+) -> List[JobPayload]:
+    """
+    Fetch several Adzuna result pages concurrently over one HTTP/2 client.
+    Accepts the same filters as fetch_realtime; jobs are returned in page order.
+    """
+    logger.info(f"Fetching {len(pages)} Adzuna pages concurrently (results_per_page={results_per_page})")
+    
+    try:
+        unknown = set(filters) - set(_FILTER_ARGUMENTS)
+        if unknown:
+            raise ValueError(f"Unsupported Adzuna filters: {', '.join(sorted(unknown))}")
+
+        query = {_FILTER_ARGUMENTS[name]: value for name, value in filters.items()}
+        params = _build_params(query, results_per_page)
+        client = _get_async_adzuna_client()
+
+        async def _fetch_page(page: int) -> List[JobPayload]:
+            response = await client.get(BASE_URL.format(page=page), params=params)
+            response.raise_for_status()
+            return _normalize_results(response.json())
+
+        page_results = await asyncio.gather(*(_fetch_page(page) for page in pages))
+        jobs = [job for page_jobs in page_results for job in page_jobs]
+
+        logger.info(f"✅ Fetched and normalized {len(jobs)} jobs from {len(pages)} Adzuna pages")
+        return jobs
+    
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ HTTP error fetching from Adzuna API: {e.response.status_code}", exc_info=True)
+        raise
+    except httpx.TimeoutException as e:
+        logger.error(f"❌ Timeout fetching from Adzuna API: {e}", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error(f"❌ Failed to fetch Adzuna pages {pages}: {e}", exc_info=True)
+        raise
+
+
+def _normalize_job(job: Dict[str, Any], now: datetime, now_iso: str) -> JobPayload:
     """Convert Adzuna job response into our unified job format."""
     job_id = job.get("id")
-    logger.info(f"Normalizing Adzuna job with id={job_id}")
+    logger.debug("Normalizing Adzuna job with id=%s", job_id)
     
     try:
-        now = datetime.utcnow()
-        location_data = job.get("location", {})
-        area = location_data.get("area", [])
+        location_data = job.get("location") or _EMPTY
+        area = location_data.get("area") or []
+        category_label = (job.get("category") or _EMPTY).get("label")
+        category_labels = [category_label] if category_label else []
 
         # Extract country (first element) and city (last element)
         country = area[0] if len(area) > 0 else None
@@ -117,35 +263,35 @@ def _normalize_job(job: Dict[str, Any]) -> JobPayload:
         else:
             display_location = None
 
-        result = {
-            "source": "adzuna",
-            "source_id": str(job_id),
-            "title": job.get("title"),
-            "company": job.get("company", {}).get("display_name"),
-            "city": city,
-            "country": country,
-            "locations": [display_location] if display_location else [],
-            "work_modes": ["remote"] if job.get("remote") else ["onsite"],
-            "categories": [job.get("category", {}).get("label")] if job.get("category") else [],
-            "levels": [],
-            "skills": [],
-            "description": job.get("description"),
-            "salary": {
+        result = JobPayload(
+            source="adzuna",
+            source_id=str(job_id),
+            title=job.get("title"),
+            company=(job.get("company") or _EMPTY).get("display_name"),
+            city=city,
+            country=country,
+            locations=[display_location] if display_location else [],
+            work_modes=["remote"] if job.get("remote") else ["onsite"],
+            categories=category_labels,
+            levels=[],
+            skills=[],
+            description=job.get("description"),
+            salary={
                 "currency": job.get("salary_currency"),
                 "min": job.get("salary_min"),
                 "max": job.get("salary_max"),
                 "predicted": job.get("salary_is_predicted"),
             },
-            "url": job.get("redirect_url"),
-            "metadata": {
-                "industry": [job.get("category", {}).get("label")] if job.get("category") else [],
-                "collected_at": now.isoformat(),
+            url=job.get("redirect_url"),
+            metadata={
+                "industry": list(category_labels),
+                "collected_at": now_iso,
             },
-            "last_seen_active": now,
-            "collected_at": now,
-        }
+            last_seen_active=now,
+            collected_at=now,
+        )
         
-        logger.info(f"✅ Normalized Adzuna job: id={job_id}, title={result['title']}, company={result['company']}")
+        logger.debug("Normalized Adzuna job: id=%s, title=%s, company=%s", job_id, result.title, result.company)
         return result
     
     except Exception as e:
@@ -161,13 +307,16 @@ def fetch_location_suggestions(query: str) -> List[str]:
             logger.info("Empty query provided, returning empty list")
             return []
 
-        url = f"https://api.teleport.org/api/cities/?search={query}"
+        cached = _suggestion_cache.get(query)
+        if cached is not None:
+            logger.info(f"Using cached location suggestions for query='{query}'")
+            return list(cached)
 
         try:
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(url)
-                response.raise_for_status()
-                data = response.json()
+            # Passed as params so httpx encodes spaces and non-ASCII input.
+            response = _TELEPORT_CLIENT.get("/api/cities/", params={"search": query})
+            response.raise_for_status()
+            data = response.json()
 
             suggestions = []
             for item in data.get("_embedded", {}).get("city:search-results", []):
@@ -176,22 +325,16 @@ def fetch_location_suggestions(query: str) -> List[str]:
                     suggestions.append(match)
 
             result = suggestions[:10]  # limit results
+            # Only successful lookups are cached; failures retry next keystroke.
+            _suggestion_cache.set(query, tuple(result))
             logger.info(f"✅ Fetched {len(result)} location suggestions from Teleport API")
             return result
 
         except Exception as exc:
             # Log error but return fallback list instead of failing
             logger.warning(f"Teleport API request failed: {exc}, using fallback cities")
-            fallback_cities = [
-                "New York, United States",
-                "San Francisco, United States",
-                "Los Angeles, United States",
-                "Seattle, United States",
-                "Chicago, United States",
-                "Boston, United States",
-                "Washington, United States",
-            ]
-            filtered = [c for c in fallback_cities if query.lower() in c.lower()]
+            lowered = query.lower()
+            filtered = [city for city, city_lower in _FALLBACK_CITIES if lowered in city_lower]
             logger.info(f"Returning {len(filtered)} fallback cities matching query")
             return filtered
     
@@ -0,0 +1,19 @@
+from services.scrapers import html_extractor
+
+JOB_POSTING_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "JobPosting", "title": "Data Engineer",
+ "description": "<p>Build data pipelines in Python.</p><ul><li>Maintain the ETL platform</li></ul>"}
+</script>
+</head>
+<body><nav>Home</nav><p>Apply now</p></body>
+</html>
+"""
+
+
+def test_parse_html_reads_json_ld_job_posting():
+    description = html_extractor._parse_html(JOB_POSTING_PAGE)
+
+    assert description == "Build data pipelines in Python.\nMaintain the ETL platform"
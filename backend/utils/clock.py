@@ -0,0 +1,42 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_request_now: ContextVar[Optional[datetime]] = ContextVar("request_now", default=None)
+
+
+def utcnow() -> datetime:
+    """Return the timestamp pinned for the current request, or the current UTC time."""
+    pinned = _request_now.get()
+    return pinned if pinned is not None else datetime.utcnow()
+
+
+@contextmanager
+def pinned_utcnow() -> Iterator[datetime]:
+    """Pin utcnow() to one timestamp for every write made inside the block."""
+    existing = _request_now.get()
+    if existing is not None:
+        # Nested entry points keep the outer request's timestamp.
+        yield existing
+        return
+
+    token = _request_now.set(datetime.utcnow())
+    try:
+        yield _request_now.get()
+    finally:
+        _request_now.reset(token)
+
+
+def pin_utcnow(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorate an async entry point so everything it awaits shares one timestamp."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        with pinned_utcnow():
+            return await func(*args, **kwargs)
+
+    return wrapper
@@ -1,6 +1,8 @@
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
 # Ensure the logs directory exists
@@ -30,9 +32,15 @@ file_handler = TimedRotatingFileHandler(
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(formatter)
 
+# --- Queue the records; a background listener thread writes them to disk ---
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_listener = QueueListener(_log_queue, file_handler, respect_handler_level=True)
+
 # --- Attach handlers if not already ---
 if not logger.hasHandlers():
-    logger.addHandler(file_handler)  # ✅ Only file handler, no console handler
+    logger.addHandler(QueueHandler(_log_queue))  # Records go through the queue to the listener's file handler
+    _queue_listener.start()
+    atexit.register(_queue_listener.stop)
 
 # Critical line: disable propagation so Uvicorn doesn't override it
 logger.propagate = False
\ No newline at end of file